@@ -1,40 +1,95 @@
 import typing as t
+import argparse
+import atexit
 import sys
+import time
+from contextlib import contextmanager
 from pathlib import Path
 
 from .lexer.scanner import Scanner
 from .parser.parser import Parser
 from .interpreter.interpreter import Interpreter
 from .interpreter.resolver import Resolver
+from .interpreter.files import BUFFER_SIZE, read_lines
+from .interpreter.output import FLUSH_POLICIES
+from .interpreter.profiler import ProfilingInterpreter
+from .interpreter.sampler import DEFAULT_INTERVAL, Sampler
+from .interpreter.hooks import trace
+from .interpreter.stats import RuntimeStats
+from .interpreter.heap import HeapSnapshot, MemoryTracker
+from .interpreter import pgo
+from .parser.nodes import walk
+from .timings import Timings
 from .handle_errors import has_any_error, update_error, has_error, has_runtime_error
 
 interpreter = Interpreter()
 
-def run(code):
-    scanner = Scanner(code)
-    tokens = scanner.scan_tokens()
+@contextmanager
+def _untimed(name: str):
+    yield {}
+
+def _compile(code, timings: t.Optional[Timings]):
+    """Scans, parses and resolves a script, exiting on a compile error; returns its tokens and statements."""
+    phase = timings.phase if timings is not None else _untimed
+
+    with phase("scan") as record:
+        scanner = Scanner(code)
+        tokens = scanner.scan_tokens()
+        record["tokens"] = len(tokens)
     if has_error(): exit(65)
 
-    parser = Parser(tokens)
-    statements = parser.parse()
+    with phase("parse") as record:
+        parser = Parser(tokens)
+        statements = parser.parse()
+    if timings is not None:
+        record["nodes"] = sum(1 for _ in walk(statements))
     if has_error(): exit(65)
 
-    resolver = Resolver(interpreter)
-    resolver.resolve(statements)
+    with phase("resolve") as record:
+        resolved = len(interpreter._locals)
+        resolver = Resolver(interpreter)
+        resolver.resolve(statements)
+        record["resolved_locals"] = len(interpreter._locals) - resolved
     if has_error(): exit(65)
+    return tokens, statements
 
-    interpreter.interpret(statements)
+def run(code, timings: t.Optional[Timings] = None):
+    _, statements = _compile(code, timings)
+    phase = timings.phase if timings is not None else _untimed
+    with phase("interpret"):
+        interpreter.interpret(statements)
+        interpreter.output.flush()
     if has_runtime_error(): exit(70)
 
 
-def runFile(path: str):
+def readFile(path: str):
     try:
-        code = Path(path).read_text()
+        return Path(path).read_text()
     except FileNotFoundError:
         print(f"File '{path}' doesn't exist.")
         exit(1)
-    
-    run(code)
+
+def runFile(path: str, timings: t.Optional[Timings] = None):
+    run(readFile(path), timings)
+
+def runRecords(path: str, separator: t.Optional[str], report: bool, timings: t.Optional[Timings] = None):
+    """Runs the script once per line of stdin; see Interpreter.interpret_records."""
+    tokens, statements = _compile(readFile(path), timings)
+
+    # only pay for splitting when the script reads the fields
+    split_fields = any(token.lexeme == "fields" for token in tokens)
+    stdin = open(sys.stdin.fileno(), encoding="utf-8", errors="replace", buffering=BUFFER_SIZE, closefd=False)
+    phase = timings.phase if timings is not None else _untimed
+    start = time.perf_counter()
+    with phase("interpret") as record:
+        count = interpreter.interpret_records(statements, read_lines(stdin), separator, split_fields)
+        interpreter.output.flush()
+        record["records"] = count
+    elapsed = time.perf_counter() - start
+    if report:
+        rate = count / elapsed if elapsed else 0
+        sys.stderr.write(f"{count} records in {elapsed:.2f}s ({rate:,.0f} records/s)\n")
+    if has_runtime_error(): exit(70)
 
 def runPrompt():
     while True:
@@ -51,13 +106,134 @@ def runPrompt():
             break
 
 def main(args: t.Optional[t.List[str]] = None):
-    args = sys.argv
-    if len(args) > 2:
-        print("Usage: pylox [script]")
-    elif len(args) == 2:
-        runFile(args[1])
-    else:
-        runPrompt()
+    args = sys.argv[1:] if args is None else args
+    if args[:1] == ["bench"]:
+        from .tools import bench
+        return bench.main(args[1:])
+    if args[:1] == ["difftest"]:
+        from .tools import differential
+        return differential.main(args[1:])
+
+    parser = argparse.ArgumentParser(prog="pylox")
+    parser.add_argument("script", nargs="?")
+    parser.add_argument("-n", dest="records", action="store_true",
+                        help="run the script once for every line of stdin")
+    parser.add_argument("-F", dest="separator", default=None,
+                        help="field separator for -n (default: whitespace)")
+    parser.add_argument("--report", action="store_true",
+                        help="with -n, print records per second to stderr")
+    parser.add_argument("--flush", choices=FLUSH_POLICIES, default=None,
+                        help="when print output is flushed (default: line on a terminal, full otherwise)")
+    parser.add_argument("--output-buffer", type=int, default=None, metavar="CHARS",
+                        help="characters of print output to buffer before flushing")
+    parser.add_argument("--profile", action="store_true",
+                        help="report time and calls per Lox function to stderr")
+    parser.add_argument("--profile-lines", action="store_true",
+                        help="with --profile, also report time per source line")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="with --profile, save the profile (JSON for .json, pstats otherwise)")
+    parser.add_argument("--sample", metavar="FILE",
+                        help="sample the Lox call stack and write collapsed stacks for flamegraphs to FILE")
+    parser.add_argument("--sample-interval", type=float, default=DEFAULT_INTERVAL, metavar="SECONDS",
+                        help=f"seconds between samples (default: {DEFAULT_INTERVAL})")
+    parser.add_argument("--trace", action="store_true",
+                        help="log Lox calls, returns, new instances and runtime errors to stderr")
+    parser.add_argument("--stats", action="store_true",
+                        help="count node dispatches, environments, binds, instances and lookups")
+    parser.add_argument("--stats-out", metavar="FILE",
+                        help="with --stats, also save the counters as JSON")
+    parser.add_argument("--timings", action="store_true",
+                        help="report time, CPU and peak memory for each phase of the run")
+    parser.add_argument("--timings-out", metavar="FILE",
+                        help="with --timings, also save them as JSON")
+    parser.add_argument("--memory", action="store_true",
+                        help="report live Lox objects and the lines that created them at exit")
+    parser.add_argument("--pgo-record", metavar="FILE",
+                        help="record branch, operand type and receiver counts for --pgo-use to FILE")
+    parser.add_argument("--pgo-use", metavar="FILE",
+                        help="specialise the script's hot sites using a profile saved with --pgo-record")
+    options = parser.parse_args(args)
+
+    global interpreter
+    profiling = options.profile or options.profile_lines or options.profile_out
+    if profiling:
+        interpreter = ProfilingInterpreter(options.script or "<stdin>", options.profile_lines)
+    if options.pgo_record or options.pgo_use:
+        if profiling:
+            parser.error("--pgo-record and --pgo-use can't be combined with --profile")
+        if options.pgo_record and options.pgo_use:
+            parser.error("--pgo-record and --pgo-use can't be combined")
+        if options.pgo_record:
+            interpreter = pgo.RecordingInterpreter()
+        else:
+            try:
+                interpreter = pgo.GuidedInterpreter(pgo.load(options.pgo_use))
+            except (OSError, ValueError) as error:
+                parser.error(f"can't use profile: {error}")
+    if options.trace:
+        for event, handler in trace(sys.stderr).items():
+            interpreter.hooks.add(event, handler)
+
+    if options.output_buffer is not None:
+        interpreter.output.buffer_size = options.output_buffer
+    if options.flush is not None:
+        interpreter.output.flush_policy = options.flush
+    # whatever is still buffered when the process ends, however it ends
+    atexit.register(interpreter.output.flush)
+
+    timings = Timings() if options.timings or options.timings_out else None
+
+    tracker = None
+    if options.memory:
+        tracker = MemoryTracker(interpreter)
+        tracker.attach()
+
+    stats = None
+    if options.stats or options.stats_out:
+        stats = RuntimeStats()
+        stats.enable()
+
+    sampler = None
+    if options.sample:
+        sampler = Sampler(options.sample_interval)
+        sampler.start()
+
+    try:
+        if options.records:
+            if options.script is None:
+                parser.error("-n needs a script")
+            runRecords(options.script, options.separator, options.report, timings)
+        elif options.script is not None:
+            runFile(options.script, timings)
+        else:
+            runPrompt()
+    finally:
+        if tracker is not None:
+            interpreter.output.flush()
+            sys.stderr.write(tracker.report(HeapSnapshot.take(interpreter)) + "\n")
+            tracker.detach()
+        if timings is not None:
+            interpreter.output.flush()
+            timings.report()
+            if options.timings_out:
+                timings.dump(options.timings_out)
+        if stats is not None:
+            stats.disable()
+            interpreter.output.flush()
+            stats.report()
+            if options.stats_out:
+                stats.dump(options.stats_out)
+        if sampler is not None:
+            sampler.stop()
+            with open(options.sample, "w") as file:
+                sampler.write_collapsed(file)
+        if profiling:
+            interpreter.output.flush()
+            interpreter.report()
+            if options.profile_out:
+                interpreter.dump(options.profile_out)
+        if options.pgo_record:
+            interpreter.dump(options.pgo_record)
 
 if __name__ == "__main__":
     main()
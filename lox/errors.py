@@ -9,6 +9,12 @@ class RuntimeException(RuntimeError):
         self.token = token
 
 
+class NativeError(RuntimeError):
+    def __init__(self, message):
+        super(NativeError, self).__init__(message)
+        self.message = message
+
+
 class Return(RuntimeError):
     def __init__(self, value):
         super(Return, self).__init__()
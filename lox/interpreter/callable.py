@@ -4,6 +4,11 @@ from abc import ABC, abstractmethod
 from .environment import Environment
 from ..parser.stmt import *
 from ..errors import Return
+from .stream import Generator
+
+# arity of natives that accept any number of arguments
+VARIADIC = -1
+
 
 class Callable(ABC):
     @abstractmethod
@@ -29,6 +34,8 @@ class Function(Callable):
         environment = Environment(self.closure)
         for i, param in enumerate(self.declaration.params):
             environment.define(param.lexeme, arguments[i])
+        if self.declaration.is_generator:
+            return Generator(interpreter, self.declaration, environment)
         try:
             interpreter._execute_block(self.declaration.body, environment)
         except Return as e:
@@ -0,0 +1,293 @@
+import typing as t
+from array import array
+from functools import cmp_to_key
+
+from .callable import Callable, Function, VARIADIC
+from .lox_class import Class
+from .lox_buffer import Buffer
+from .lox_list import List
+from .rope import Rope
+from .stream import Stream
+from ..errors import NativeError
+from ..number import MAX_EXACT_INT, is_number
+
+
+def _list_argument(value: t.Any, native: str):
+    if not isinstance(value, List):
+        raise NativeError(f"'{native}' expects a list.")
+    return value
+
+
+def _sequence_argument(value: t.Any, native: str):
+    """The items of a list, or the stream itself, for natives that take either."""
+    if isinstance(value, List):
+        return value.items
+    if isinstance(value, Stream):
+        return value
+    raise NativeError(f"'{native}' expects a list or an iterator.")
+
+
+def _integer_argument(value: t.Any, native: str, expected: str = "integer bounds"):
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if type(value) is not int:
+        raise NativeError(f"'{native}' expects {expected}.")
+    return value
+
+
+def _numbers(items: t.Any, native: str):
+    """The items, verified to be numbers; typed arrays never need the check."""
+    if type(items) is array:
+        return items
+    return _checked_numbers(items, native)
+
+
+def _checked_numbers(items: t.Iterable[t.Any], native: str):
+    for item in items:
+        if not is_number(item):
+            raise NativeError(f"'{native}' expects numbers.")
+        yield item
+
+
+def _call(interpreter, function: t.Any, arguments: t.List[t.Any], native: str):
+    if not isinstance(function, Callable) or function.arity not in (len(arguments), VARIADIC):
+        raise NativeError(f"'{native}' expects a function taking {len(arguments)} arguments.")
+    if not isinstance(function, (Function, Class)):
+        arguments = [str(arg) if type(arg) is Rope else arg for arg in arguments]
+    return function.call(interpreter, arguments)
+
+
+class Range(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        start = _integer_argument(arguments[0], "range")
+        end = _integer_argument(arguments[1], "range")
+        return List(range(start, end))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Push(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        list_ = _list_argument(arguments[0], "push")
+        list_.append(arguments[1])
+        return len(list_)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Pop(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        list_ = _list_argument(arguments[0], "pop")
+        if not len(list_):
+            raise NativeError("Can't pop from an empty list.")
+        return list_.pop()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Slice(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        sequence = arguments[0]
+        start = _integer_argument(arguments[1], "slice")
+        end = _integer_argument(arguments[2], "slice")
+        if isinstance(sequence, str):
+            return sequence[start:end]
+        elif isinstance(sequence, Buffer):
+            return sequence.slice(start, end)
+        return List(_list_argument(sequence, "slice").items[start:end])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Concat(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        left = _list_argument(arguments[0], "concat")
+        right = _list_argument(arguments[1], "concat")
+        return List([*left.items, *right.items])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Sort(Callable):
+    """sort(list, nil) orders numbers or strings, sort(list, fun(a)) sorts by
+    key and sort(list, fun(a, b)) uses a comparator returning a number."""
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _sequence_argument(arguments[0], "sort")
+        if type(items) is not array:
+            # long strings built with `+` are ropes; order them as the strings they are
+            items = [str(item) if type(item) is Rope else item for item in items]
+        function = arguments[1]
+        if function is None:
+            if type(items) is not array and not (
+                all(is_number(item) for item in items) or all(isinstance(item, str) for item in items)
+            ):
+                raise NativeError("'sort' without a function can only order numbers or strings.")
+            return List(sorted(items))
+
+        if isinstance(function, Callable) and function.arity == 2:
+            def compare(a, b):
+                order = _call(interpreter, function, [a, b], "sort")
+                if not is_number(order):
+                    raise NativeError("'sort' comparator must return a number.")
+                return order
+            return List(sorted(items, key=cmp_to_key(compare)))
+
+        keys = [_call(interpreter, function, [item], "sort") for item in items]
+        keys = [str(key) if type(key) is Rope else key for key in keys]
+        try:
+            order = sorted(range(len(items)), key=keys.__getitem__)
+        except TypeError:
+            raise NativeError("'sort' keys must all be numbers or all be strings.")
+        return List([items[i] for i in order])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Sum(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _sequence_argument(arguments[0], "sum")
+        total = sum(_numbers(items, "sum"))
+        if type(total) is int and not -MAX_EXACT_INT <= total <= MAX_EXACT_INT:
+            if isinstance(items, Stream):
+                return float(total)
+            # past 2**53 doubles round on every addition, so add the way Lox would
+            total = 0.0
+            for item in items:
+                total += item
+        return total
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Min(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _numbers(_sequence_argument(arguments[0], "min"), "min")
+        try:
+            return min(items)
+        except ValueError:
+            raise NativeError("'min' of an empty list.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Max(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _numbers(_sequence_argument(arguments[0], "max"), "max")
+        try:
+            return max(items)
+        except ValueError:
+            raise NativeError("'max' of an empty list.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Map(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _sequence_argument(arguments[0], "map")
+        function = arguments[1]
+        mapped = (_call(interpreter, function, [item], "map") for item in items)
+        if isinstance(items, Stream):
+            return Stream(mapped)
+        return List(list(mapped))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Filter(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _sequence_argument(arguments[0], "filter")
+        function = arguments[1]
+        kept = (
+            item for item in items
+            if interpreter._is_truthy(_call(interpreter, function, [item], "filter"))
+        )
+        if isinstance(items, Stream):
+            return Stream(kept)
+        return List(list(kept))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Reduce(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        items = _sequence_argument(arguments[0], "reduce")
+        function = arguments[1]
+        accumulator = arguments[2]
+        for item in items:
+            accumulator = _call(interpreter, function, [accumulator, item], "reduce")
+        return accumulator
+
+    def __repr__(self):
+        return "<native function>"
+
+
+
+class Collect(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return List(list(_sequence_argument(arguments[0], "collect")))
+
+    def __repr__(self):
+        return "<native function>"
@@ -0,0 +1,179 @@
+import typing as t
+import csv
+import io
+import json
+from array import array
+
+from .callable import Callable
+from .files import BUFFER_SIZE, to_text
+from .lox_class import Instance
+from .lox_list import List
+from .lox_map import Map, _value_of
+from .rope import Rope
+from .stream import Stream
+from .vector import Vector
+from ..errors import NativeError
+from ..number import exact, normalize
+
+
+def _string_argument(value: t.Any, native: str):
+    if not isinstance(value, str):
+        raise NativeError(f"'{native}' expects a string.")
+    return value
+
+
+def _open(path: t.Any, native: str, **options):
+    path = _string_argument(path, native)
+    try:
+        return open(path, encoding="utf-8", errors="replace", buffering=BUFFER_SIZE, **options)
+    except OSError as e:
+        raise NativeError(f"Can't open '{path}': {e.strerror}.")
+
+
+def _lox_list(values: t.List[t.Any]):
+    # objects come out of the decoder as Maps already, only arrays need a second look
+    return List([_lox_list(value) if type(value) is list else value for value in values])
+
+
+def _lox_map(pairs: t.List[t.Tuple[str, t.Any]]):
+    map_ = Map()
+    map_.entries = {key: _lox_list(value) if type(value) is list else value for key, value in pairs}
+    return map_
+
+
+_decoder = json.JSONDecoder(
+    object_pairs_hook=_lox_map,
+    parse_int=lambda text: exact(int(text)),
+    parse_float=lambda text: normalize(float(text)),
+)
+
+
+def _decode(text: str):
+    try:
+        value = _decoder.decode(text)
+    except json.JSONDecodeError as e:
+        raise NativeError(f"Invalid JSON at line {e.lineno} column {e.colno}: {e.msg}.")
+    return _lox_list(value) if type(value) is list else value
+
+
+def _json_default(value: t.Any):
+    if isinstance(value, List):
+        if type(value.items) is array and value.items.typecode == "d":
+            # typed lists hold every number as a double; write the integral ones as ints
+            return [normalize(item) for item in value.items]
+        return list(value.items)
+    elif isinstance(value, Map):
+        return {_value_of(key): item for key, item in value.entries.items()}
+    elif isinstance(value, Instance):
+        return dict(zip(value.shape.slots, value.values))
+    elif isinstance(value, Vector):
+        return value.tolist()
+    elif isinstance(value, Rope):
+        return str(value)
+    raise NativeError(f"Can't convert {value} to JSON.")
+
+
+def _encode(value: t.Any):
+    try:
+        return json.dumps(value, default=_json_default, allow_nan=False)
+    except (TypeError, ValueError) as e:
+        raise NativeError(f"Can't convert to JSON: {e}.")
+
+
+def _rows(reader: t.Iterable[t.List[str]]):
+    try:
+        for row in reader:
+            yield List(row)
+    except csv.Error as e:
+        raise NativeError(f"Invalid CSV: {e}.")
+
+
+def _read_rows(file: t.TextIO):
+    with file:
+        yield from _rows(csv.reader(file))
+
+
+def _read_json_lines(file: t.TextIO):
+    with file:
+        for line in file:
+            if line.strip():
+                yield _decode(line)
+
+
+class Json_parse(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _decode(_string_argument(arguments[0], "json_parse"))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Json_string(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _encode(arguments[0])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Json_lines(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return Stream(_read_json_lines(_open(arguments[0], "json_lines")))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Csv_parse(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        text = _string_argument(arguments[0], "csv_parse")
+        return List(list(_rows(csv.reader(io.StringIO(text)))))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Csv_rows(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return Stream(_read_rows(_open(arguments[0], "csv_rows", newline="")))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Csv_string(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        rows = arguments[0]
+        if not isinstance(rows, List) or not all(isinstance(row, List) for row in rows.items):
+            raise NativeError("'csv_string' expects a list of lists.")
+        output = io.StringIO()
+        writer = csv.writer(output, lineterminator="\n")
+        writer.writerows([to_text(value) for value in row.items] for row in rows.items)
+        return output.getvalue()
+
+    def __repr__(self):
+        return "<native function>"
@@ -0,0 +1,132 @@
+"""Exposing Python functions to Lox.
+
+    from lox.interpreter.ffi import lox_native, VARIADIC
+
+    @lox_native("hypot", 2)
+    def hypot(x, y):
+        return math.hypot(x, y)
+
+    @lox_native("join", VARIADIC)
+    def join(*parts):
+        return "".join(parts)
+
+Functions registered with the decorator are defined in every Interpreter
+created afterwards; `Interpreter.register_native` adds one to a live
+interpreter. Lox values are handed over as they are: strings are `str`,
+lists and maps are the interpreter's own `List`/`Map` objects, so nothing is
+copied on the way in. Returned Python lists, tuples and dicts become Lox lists
+and maps.
+"""
+import inspect
+import typing as t
+
+from .callable import Callable, VARIADIC
+from .lox_list import List
+from .lox_map import Map
+from .rope import Rope
+from ..errors import NativeError, RuntimeException
+from ..number import exact
+
+_registry = {}
+
+_PASSED_THROUGH = (str, float, bool, type(None), List, Map)
+
+
+def to_lox(value: t.Any):
+    """Converts a Python return value into a Lox value."""
+    kind = type(value)
+    if kind in _PASSED_THROUGH:
+        return value
+    if kind is int:
+        return exact(value)
+    if isinstance(value, (list, tuple)):
+        return List([to_lox(item) for item in value])
+    if isinstance(value, dict):
+        map_ = Map()
+        for key, item in value.items():
+            map_.set(to_lox(key), to_lox(item))
+        return map_
+    if isinstance(value, float):  # e.g. numpy.float64
+        return float(value)
+    if isinstance(value, int):
+        return exact(int(value))
+    return value
+
+
+def _infer_arity(function: t.Callable):
+    parameters = inspect.signature(function).parameters.values()
+    if any(parameter.kind == parameter.VAR_POSITIONAL for parameter in parameters):
+        return VARIADIC
+    return sum(
+        1 for parameter in parameters
+        if parameter.kind in (parameter.POSITIONAL_ONLY, parameter.POSITIONAL_OR_KEYWORD)
+    )
+
+
+class PythonNative(Callable):
+    """A Python function callable from Lox.
+
+    The interpreter dispatches on `type(callee) is PythonNative` before the
+    generic Callable checks and calls `invoke` directly.
+    """
+    def __init__(self, name: str, function: t.Callable, arity: int, with_interpreter: bool = False):
+        self.name = name
+        self.function = function
+        self._arity = arity
+        self._with_interpreter = with_interpreter
+
+    @property
+    def arity(self):
+        return self._arity
+
+    def invoke(self, interpreter, arguments: t.List[t.Any]):
+        arity = self._arity
+        if arity != len(arguments) and arity != VARIADIC:
+            raise NativeError(f"Expected {arity} arguments, but got {len(arguments)}.")
+        for argument in arguments:
+            if type(argument) is Rope:
+                arguments = [str(arg) if type(arg) is Rope else arg for arg in arguments]
+                break
+        try:
+            if self._with_interpreter:
+                result = self.function(interpreter, *arguments)
+            else:
+                result = self.function(*arguments)
+        except (NativeError, RuntimeException):
+            # RuntimeException comes from a Lox callback and already points at its line
+            raise
+        except Exception as e:
+            raise NativeError(f"Error in native '{self.name}': {e}")
+        if type(result) in _PASSED_THROUGH:
+            return result
+        return to_lox(result)
+
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return self.invoke(interpreter, arguments)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+def lox_native(name: t.Optional[str] = None, arity: t.Optional[int] = None, with_interpreter: bool = False):
+    """Registers the decorated function as a Lox native.
+
+    `name` defaults to the function's name and `arity` to its number of
+    positional parameters, or VARIADIC if it takes *args. With
+    `with_interpreter` the function receives the interpreter first, which it
+    needs to call Lox functions passed to it.
+    """
+    def register(function: t.Callable):
+        native_arity = arity
+        if native_arity is None:
+            native_arity = _infer_arity(function)
+            if with_interpreter and native_arity != VARIADIC:
+                native_arity -= 1
+        native_name = name or function.__name__
+        _registry[native_name] = PythonNative(native_name, function, native_arity, with_interpreter)
+        return function
+    return register
+
+
+def registered_natives():
+    return dict(_registry)
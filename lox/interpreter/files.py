@@ -0,0 +1,55 @@
+import typing as t
+
+from ..number import format_number
+
+# Reads and writes go through buffers this large, so a multi-GB file costs a
+# few thousand syscalls instead of millions.
+BUFFER_SIZE = 1 << 20
+
+
+def read_lines(file: t.TextIO):
+    """Yields the lines of an open file without their line endings, then closes it."""
+    with file:
+        for line in file:
+            if line[-1:] == "\n":
+                line = line[:-1]
+            yield line
+
+
+def to_text(value: t.Any):
+    """A Lox value as it is written to a file: numbers in full, nil and booleans spelled out."""
+    if value is None:
+        return "nil"
+    kind = type(value)
+    if kind is str:
+        return value
+    if kind is bool:
+        return "true" if value else "false"
+    if kind is int or kind is float:
+        return format_number(value)
+    # ropes, lists, maps and instances
+    return str(value)
+
+
+class Writer:
+    """A buffered text file opened for writing by the `open_writer` native."""
+
+    def __init__(self, path: str, buffer_size: int = BUFFER_SIZE):
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8", buffering=buffer_size)
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def write(self, text: str):
+        self._file.write(text)
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __str__(self):
+        return f"<writer {self.path}>"
@@ -0,0 +1,262 @@
+"""Heap snapshots of live Lox objects, for `pylox --memory` and the heap natives.
+
+A snapshot walks everything reachable from the globals and from the
+environments of the calls that are running, and groups what it finds by
+category: instances by class, lists by length, maps, closures, environments
+and strings. Sizes come from sys.getsizeof and are approximate.
+
+With a MemoryTracker attached, instances, lists, maps, closures and
+environments also remember the Lox line they were created on, so snapshots
+can say where the memory came from.
+"""
+import typing as t
+import sys
+import tracemalloc
+from collections import Counter
+
+from .callable import Function
+from .environment import Environment
+from .lox_buffer import Buffer
+from .lox_class import Class, Instance
+from .lox_list import List
+from .lox_map import Map
+from .rope import Rope
+from .stream import Generator, Stream
+from .vector import Vector
+from ..parser.nodes import line_of
+
+MB = 1 << 20
+
+
+def _length_bucket(length: int):
+    if length == 0:
+        return "0"
+    low = 1
+    while low * 10 <= length:
+        low *= 10
+    return f"{low}-{low * 10 - 1}"
+
+
+def _category(value: t.Any):
+    kind = type(value)
+    if kind is str or kind is Rope:
+        return "string"
+    elif kind is Instance:
+        return f"instance {value.lox_class.name}"
+    elif kind is List:
+        return f"list [{_length_bucket(len(value))}]"
+    elif kind is Map:
+        return "map"
+    elif kind is Environment:
+        return "environment"
+    elif isinstance(value, Function):
+        return "closure"
+    elif isinstance(value, Class):
+        return "class"
+    elif kind is Vector:
+        return "vector"
+    elif kind is Buffer:
+        return "buffer"
+    elif isinstance(value, Stream):
+        return "iterator"
+    return None
+
+
+def _size(value: t.Any):
+    kind = type(value)
+    if kind is Instance:
+        return sys.getsizeof(value) + sys.getsizeof(value.values)
+    elif kind is List:
+        return sys.getsizeof(value) + sys.getsizeof(value.items)
+    elif kind is Map:
+        return sys.getsizeof(value) + sys.getsizeof(value.entries)
+    elif kind is Environment:
+        return sys.getsizeof(value) + sys.getsizeof(value._variables)
+    elif kind is Rope:
+        return sys.getsizeof(value) + len(value)
+    elif kind is Vector:
+        return sys.getsizeof(value) + getattr(value.data, "nbytes", sys.getsizeof(value.data))
+    elif kind is Buffer:
+        return sys.getsizeof(value) + len(value)
+    return sys.getsizeof(value)
+
+
+def _references(value: t.Any):
+    kind = type(value)
+    if kind is Environment:
+        yield from value._variables.values()
+        if value._enclosing is not None:
+            yield value._enclosing
+    elif kind is Instance:
+        yield value.lox_class
+        yield from value.values
+    elif kind is List:
+        if type(value.items) is list:
+            yield from value.items
+    elif kind is Map:
+        yield from value.entries.keys()
+        yield from value.entries.values()
+    elif isinstance(value, Function):
+        yield value.closure
+    elif isinstance(value, Class):
+        yield from value.methods.values()
+        if value.superclass is not None:
+            yield value.superclass
+    elif kind is Generator:
+        # the locals of a generator that is part way through its body
+        yield value._suspended
+
+
+def _running_environments():
+    """Environments held by the interpreter's Python frames: the callers of the current call."""
+    frame = sys._getframe()
+    while frame is not None:
+        for value in frame.f_locals.values():
+            if type(value) is Environment:
+                yield value
+        frame = frame.f_back
+
+
+class HeapSnapshot:
+    """Live Lox objects grouped by category, and by creation line when tracked."""
+
+    def __init__(self):
+        # category -> [count, bytes]
+        self.categories = {}
+        # (line, category) -> [count, bytes]
+        self.sites = {}
+        # environments -> how many scopes sit above them
+        self.chain_depths = Counter()
+
+    @classmethod
+    def take(cls, interpreter):
+        snapshot = cls()
+        tracker = interpreter.memory_tracker
+        sites = tracker.sites if tracker is not None else {}
+        tracked = tracker.TRACKED if tracker is not None else ()
+        seen = set()
+        stack = [interpreter.globals, interpreter._environment, *_running_environments()]
+        while stack:
+            value = stack.pop()
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+            category = _category(value)
+            if category is None:
+                continue
+            size = _size(value)
+            entry = snapshot.categories.setdefault(category, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+            # only tracked types: anything else may have the id of a dead tracked object
+            line = sites.get(id(value)) if isinstance(value, tracked) else None
+            if line is not None:
+                site = snapshot.sites.setdefault((line, category), [0, 0])
+                site[0] += 1
+                site[1] += size
+            if type(value) is Environment:
+                snapshot.chain_depths[_depth(value)] += 1
+            stack.extend(_references(value))
+        return snapshot
+
+    def diff(self, before: "HeapSnapshot"):
+        """What this snapshot has that `before` didn't, as a snapshot of the differences."""
+        difference = HeapSnapshot()
+        for mine, theirs, into in (
+            (self.categories, before.categories, difference.categories),
+            (self.sites, before.sites, difference.sites),
+        ):
+            for key in mine.keys() | theirs.keys():
+                count, size = mine.get(key, (0, 0))
+                old_count, old_size = theirs.get(key, (0, 0))
+                if count != old_count or size != old_size:
+                    into[key] = [count - old_count, size - old_size]
+        difference.chain_depths = Counter(self.chain_depths)
+        difference.chain_depths.subtract(before.chain_depths)
+        return difference
+
+    def report(self, limit: int = 15):
+        lines = [f"{'count':>10} {'bytes':>12}  category"]
+        categories = sorted(self.categories.items(), key=lambda item: abs(item[1][1]), reverse=True)
+        for category, (count, size) in categories[:limit]:
+            lines.append(f"{count:>10} {size:>12}  {category}")
+        if self.sites:
+            lines.append("")
+            lines.append(f"{'count':>10} {'bytes':>12}  created at")
+            sites = sorted(self.sites.items(), key=lambda item: abs(item[1][1]), reverse=True)
+            for (line, category), (count, size) in sites[:limit]:
+                lines.append(f"{count:>10} {size:>12}  line {line}: {category}")
+        depths = {depth: count for depth, count in sorted(self.chain_depths.items()) if count}
+        if depths:
+            lines.append("")
+            lines.append("environment chain depths: " + ", ".join(f"{d}: {c}" for d, c in depths.items()))
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+def _depth(environment: Environment):
+    depth = 0
+    while environment._enclosing is not None:
+        environment = environment._enclosing
+        depth += 1
+    return depth
+
+
+class MemoryTracker:
+    """Records the Lox line that created each instance, list, map, closure and environment.
+
+    It traces Python allocations with tracemalloc as well, for the overall
+    current and peak figures. Everything is undone by detach().
+    """
+    TRACKED = (Instance, List, Map, Function, Environment)
+
+    def __init__(self, interpreter):
+        self.interpreter = interpreter
+        # id(object) -> line it was created on. A dead object's id can be reused
+        # by anything; a tracked type's constructor overwrites the entry, and
+        # HeapSnapshot.take only looks up objects of tracked types.
+        self.sites = {}
+        self.line = 0
+        self._statement_lines = {}
+        self._originals = []
+
+    def attach(self):
+        tracemalloc.start()
+        self.interpreter.memory_tracker = self
+        self.interpreter.hooks.add("on_statement", self._on_statement)
+        for cls in self.TRACKED:
+            original = cls.__init__
+            self._originals.append((cls, original))
+            cls.__init__ = self._recording(original)
+
+    def detach(self):
+        for cls, original in self._originals:
+            cls.__init__ = original
+        self._originals.clear()
+        self.interpreter.hooks.remove("on_statement", self._on_statement)
+        self.interpreter.memory_tracker = None
+        tracemalloc.stop()
+
+    def _on_statement(self, interpreter, statement):
+        line = self._statement_lines.get(statement)
+        if line is None:
+            line = self._statement_lines[statement] = line_of(statement) or self.line
+        self.line = line
+
+    def _recording(self, init: t.Callable):
+        sites = self.sites
+        tracker = self
+
+        def recorded(obj, *args, **kwargs):
+            init(obj, *args, **kwargs)
+            sites[id(obj)] = tracker.line
+        return recorded
+
+    def report(self, snapshot: HeapSnapshot):
+        current, peak = tracemalloc.get_traced_memory()
+        return (
+            f"{snapshot.report()}\n\n"
+            f"Python heap traced: {current / MB:.1f} MB now, {peak / MB:.1f} MB at peak"
+        )
@@ -0,0 +1,196 @@
+"""Execution hooks for tracers, coverage tools and debuggers.
+
+    def show(interpreter, name, declaration, arguments):
+        print(name, arguments)
+
+    interpreter.hooks.add("on_call", show)
+
+The handlers are called as:
+
+    on_statement(interpreter, statement)             before every statement
+    on_call(interpreter, name, declaration, args)    a Lox function or method starts
+    on_return(interpreter, name, declaration, value) ... and finishes
+    on_runtime_error(interpreter, error)             where a RuntimeException is raised
+    on_instance_created(interpreter, instance)       a class was called
+
+While nothing is registered the interpreter is a plain Interpreter with no
+checks anywhere. The first handler swaps the instance's class for an
+instrumented subclass and removing the last one swaps it back.
+"""
+import typing as t
+
+from .lox_class import Class
+from ..errors import Return, RuntimeException
+
+EVENTS = ("on_statement", "on_call", "on_return", "on_runtime_error", "on_instance_created")
+
+
+class Hooks:
+    def __init__(self, interpreter):
+        self._interpreter = interpreter
+        self.handlers = {event: [] for event in EVENTS}
+        # the error on_runtime_error was last fired for, so unwinding doesn't repeat it
+        self.last_error = None
+
+    def add(self, event: str, handler: t.Callable):
+        if event not in self.handlers:
+            raise ValueError(f"Unknown hook '{event}', expected one of {', '.join(EVENTS)}.")
+        self.handlers[event].append(handler)
+        self._update()
+
+    def remove(self, event: str, handler: t.Callable):
+        self.handlers[event].remove(handler)
+        self._update()
+
+    def __bool__(self):
+        return any(self.handlers.values())
+
+    def _update(self):
+        interpreter = self._interpreter
+        cls = type(interpreter)
+        instrumented = getattr(cls, "plain", None) is not None
+        if self and not instrumented:
+            interpreter.__class__ = _instrumented(cls)
+            # classes declared from now on are instrumented by visit_class_stmt
+            for value in list(interpreter.globals._variables.values()):
+                _instrument_class(value)
+        elif not self and instrumented:
+            interpreter.__class__ = cls.plain
+
+
+class _HookedClass(Class):
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        instance = super().call(interpreter, arguments)
+        for handler in interpreter.hooks.handlers["on_instance_created"]:
+            handler(interpreter, instance)
+        return instance
+
+
+def _instrument_class(value: t.Any):
+    if type(value) is Class:
+        value.__class__ = _HookedClass
+
+
+class _Instrumented:
+    """The methods an instrumented interpreter class overrides; see _instrumented.
+
+    They are copied onto a direct subclass rather than mixed in, because an
+    object's __class__ can only be swapped for a class with the same layout.
+    `plain` is the class being instrumented.
+    """
+
+    def _execute(self, statement):
+        hooks = self.hooks
+        for handler in hooks.handlers["on_statement"]:
+            handler(self, statement)
+        try:
+            return self.plain._execute(self, statement)
+        except RuntimeException as e:
+            if e is not hooks.last_error:
+                hooks.last_error = e
+                for handler in hooks.handlers["on_runtime_error"]:
+                    handler(self, e)
+            raise
+
+    def _execute_block(self, statements, environment):
+        function = self._functions.get(id(statements))
+        if function is None:
+            return self.plain._execute_block(self, statements, environment)
+
+        _, name, declaration = function
+        handlers = self.hooks.handlers
+        _fire_call(self, handlers, name, declaration, environment)
+        try:
+            self.plain._execute_block(self, statements, environment)
+        except Return as e:
+            for handler in handlers["on_return"]:
+                handler(self, name, declaration, e.value)
+            raise
+        for handler in handlers["on_return"]:
+            handler(self, name, declaration, None)
+
+    # Generator bodies run through these instead, starting on the first
+    # resume, so the call and return events bracket the whole iteration.
+
+    def _execute_suspendable_block(self, statements, environment):
+        function = self._functions.get(id(statements))
+        if function is None:
+            return (yield from self.plain._execute_suspendable_block(self, statements, environment))
+
+        _, name, declaration = function
+        handlers = self.hooks.handlers
+        _fire_call(self, handlers, name, declaration, environment)
+        try:
+            yield from self.plain._execute_suspendable_block(self, statements, environment)
+        except Return as e:
+            for handler in handlers["on_return"]:
+                handler(self, name, declaration, e.value)
+            raise
+        for handler in handlers["on_return"]:
+            handler(self, name, declaration, None)
+
+    def _execute_suspendable(self, statement):
+        hooks = self.hooks
+        for handler in hooks.handlers["on_statement"]:
+            handler(self, statement)
+        try:
+            return (yield from self.plain._execute_suspendable(self, statement))
+        except RuntimeException as e:
+            if e is not hooks.last_error:
+                hooks.last_error = e
+                for handler in hooks.handlers["on_runtime_error"]:
+                    handler(self, e)
+            raise
+
+    def visit_class_stmt(self, stmt):
+        self.plain.visit_class_stmt(self, stmt)
+        _instrument_class(self._environment.get(stmt.name))
+        return None
+
+
+def _fire_call(interpreter, handlers: dict, name: str, declaration, environment):
+    if handlers["on_call"]:
+        arguments = [environment.get_at(0, param.lexeme) for param in declaration.params]
+        for handler in handlers["on_call"]:
+            handler(interpreter, name, declaration, arguments)
+
+
+_instrumented_classes = {}
+
+
+def _instrumented(cls: type):
+    instrumented = _instrumented_classes.get(cls)
+    if instrumented is None:
+        methods = {
+            name: value for name, value in vars(_Instrumented).items() if not name.startswith("__")
+        }
+        instrumented = type(f"Hooked{cls.__name__}", (cls,), {**methods, "plain": cls})
+        _instrumented_classes[cls] = instrumented
+    return instrumented
+
+
+def trace(stream: t.TextIO):
+    """Registers handlers that log calls, returns, errors and new instances, for `pylox --trace`."""
+    depth = [0]
+
+    def on_call(interpreter, name, declaration, arguments):
+        shown = ", ".join(interpreter._stringify(argument) for argument in arguments)
+        stream.write(f"{'  ' * depth[0]}-> {name}({shown})  line {declaration.name.line}\n")
+        depth[0] += 1
+
+    def on_return(interpreter, name, declaration, value):
+        depth[0] -= 1
+        stream.write(f"{'  ' * depth[0]}<- {name} = {interpreter._stringify(value)}\n")
+
+    def on_runtime_error(interpreter, error):
+        stream.write(f"{'  ' * depth[0]}!! {error.message}  line {error.token.line}\n")
+
+    def on_instance_created(interpreter, instance):
+        stream.write(f"{'  ' * depth[0]}+ {instance}\n")
+
+    return {
+        "on_call": on_call,
+        "on_return": on_return,
+        "on_runtime_error": on_runtime_error,
+        "on_instance_created": on_instance_created,
+    }
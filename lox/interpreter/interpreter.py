@@ -1,16 +1,34 @@
 import typing as t
+from collections.abc import Iterator
 
 from ..lexer.token_type import TokenType
 from ..lexer.token import Token
 from ..parser.expr import *
 from ..parser.stmt import *
-from ..errors import RuntimeException, Return
+from ..errors import RuntimeException, NativeError, Return
 from ..handle_errors import runtime_error
+from ..number import MAX_EXACT_INT, NUMBER_TYPES, exact
 from .environment import Environment
 from .callable import Callable, Function
 import lox.interpreter.natives as natives
+import lox.interpreter.collection_natives as collection_natives
+import lox.interpreter.vec_natives as vec_natives
+import lox.interpreter.io_natives as io_natives
+import lox.interpreter.data_natives as data_natives
 from lox.interpreter.natives import *
 from .lox_class import Class, Instance
+from .lox_list import List
+from .lox_map import Map
+from .rope import Rope, concat
+from .vector import Vector
+from .lox_buffer import Buffer
+from .ffi import PythonNative, registered_natives
+from .output import Output, STREAM_THRESHOLD
+from .hooks import Hooks
+
+
+# top-level statements that run once under interpret_records; `var x = [...]` is a List_stmt
+DECLARATIONS = (Function_stmt, Class_stmt, Var_stmt, List_stmt)
 
 
 def classesinmodule(module):
@@ -23,23 +41,91 @@ def classesinmodule(module):
 
 
 class Interpreter(BaseVisitor, StmtVisitor):
-    def __init__(self):
+    def __init__(self, output: t.Optional[Output] = None):
         self.globals = Environment()
+        # what `print` writes to; see lox.interpreter.output
+        self.output = output if output is not None else Output()
         self._locals = {}
+        # Get_expr/Set_expr -> (shape, slot[, next shape]) seen at that site last time
+        self._shape_caches = {}
+        # Stmt -> whether running it can reach a yield
+        self._suspending = {}
+        # id of a function body -> (body, name, Function_stmt), filled in by the resolver
+        self._functions = {}
+        self.hooks = Hooks(self)
+        # set while a heap.MemoryTracker is recording allocation sites
+        self.memory_tracker = None
         self._environment = self.globals
-        native_function_classes = classesinmodule(natives)
-        for cls in native_function_classes:
-            self.globals.define(cls.__name__.lower(), cls())
+        for module in (natives, collection_natives, vec_natives, io_natives, data_natives):
+            for cls in classesinmodule(module):
+                self.globals.define(cls.__name__.lower(), cls())
+        for name, native in registered_natives().items():
+            self.globals.define(name, native)
+
+    def register_native(self, name: str, function: t.Callable, arity: int, with_interpreter: bool = False):
+        """Defines a Python function as a global; see lox.interpreter.ffi."""
+        self.globals.define(name, PythonNative(name, function, arity, with_interpreter))
 
     def interpret(self, statements: t.List["Stmt"]):
         try:
             for statement in statements:
                 self._execute(statement)
         except RuntimeException as e:
+            self.output.flush()
+            runtime_error(e)
+        finally:
+            self.output.flush()
+
+    def interpret_records(
+        self,
+        statements: t.List["Stmt"],
+        records: t.Iterable[str],
+        separator: t.Optional[str] = None,
+        split_fields: bool = True,
+    ):
+        """Runs a script once per input record, awk style (`pylox -n`).
+
+        Top-level fun, class and var declarations run once, then the remaining
+        statements run for every record with the globals `record`, `nr` and
+        `fields` set. `fun BEGIN()` and `fun END()` are called around the
+        records if the script declares them. Returns the number of records run.
+        """
+        declarations = [s for s in statements if isinstance(s, DECLARATIONS)]
+        body = [s for s in statements if not isinstance(s, DECLARATIONS)]
+        execute = self._execute
+        define = self.globals.define
+        count = 0
+        try:
+            for statement in declarations:
+                execute(statement)
+            self._call_hook("BEGIN")
+            for record in records:
+                count += 1
+                define("record", record)
+                define("nr", count)
+                if split_fields:
+                    define("fields", List(record.split(separator)))
+                for statement in body:
+                    execute(statement)
+            self._call_hook("END")
+        except RuntimeException as e:
+            self.output.flush()
             runtime_error(e)
+        finally:
+            self.output.flush()
+        return count
+
+    def _call_hook(self, name: str):
+        hook = self.globals.get_at(0, name)
+        if isinstance(hook, Callable) and hook.arity == 0:
+            hook.call(self, [])
     
     def resolve(self, expr: Expr, depth: int):
         self._locals[expr] = depth
+
+    def resolve_function(self, declaration: "Function_stmt", name: str):
+        # the entry holds on to the body, so its id can't be reused while it's here
+        self._functions[id(declaration.body)] = (declaration.body, name, declaration)
         
     def visit_block_stmt(self, stmt: "Block_stmt"):
         self._execute_block(stmt.statements, Environment(self._environment))
@@ -105,6 +191,109 @@ class Interpreter(BaseVisitor, StmtVisitor):
             self._execute(stmt.body)
         return None
     
+    def visit_foreach_stmt(self, stmt: "Foreach_stmt"):
+        items = self._iterate(self._evaluate(stmt.iterable), stmt.name)
+        name = stmt.name.lexeme
+        previous = self._environment
+        try:
+            self._environment = Environment(previous)
+            for item in items:
+                self._environment.define(name, item)
+                self._execute(stmt.body)
+        except NativeError as e:
+            # raised by a lazy native while producing the next item
+            raise RuntimeException(stmt.name, e.message)
+        finally:
+            self._environment = previous
+        return None
+
+    def _iterate(self, iterable: t.Any, token: Token):
+        if isinstance(iterable, (List, Map, Vector, str, Buffer, Iterator)):
+            return iter(iterable)
+        elif type(iterable) is Rope:
+            return iter(str(iterable))
+        raise RuntimeException(token, "Can only iterate over lists, strings, maps, vectors, buffers and iterators.")
+
+    def visit_yield_stmt(self, stmt: "Yield_stmt"):
+        # generator bodies run through _execute_suspendable, never through here
+        raise RuntimeException(stmt.keyword, "Can't yield outside of a generator.")
+
+    def _suspends(self, stmt: "Stmt"):
+        suspends = self._suspending.get(stmt)
+        if suspends is None:
+            kind = type(stmt)
+            if kind is Yield_stmt:
+                suspends = True
+            elif kind is Block_stmt:
+                suspends = any(self._suspends(statement) for statement in stmt.statements)
+            elif kind is If_stmt:
+                suspends = self._suspends(stmt.then_branch) or (
+                    stmt.else_branch is not None and self._suspends(stmt.else_branch)
+                )
+            elif kind is While_stmt or kind is Foreach_stmt:
+                suspends = self._suspends(stmt.body)
+            else:
+                suspends = False
+            self._suspending[stmt] = suspends
+        return suspends
+
+    def _execute_suspendable_block(self, statements: t.List["Stmt"], environment: "Environment"):
+        # No try/finally here: a generator that is dropped half way gets closed
+        # whenever it is collected, and restoring an environment at that point
+        # would clobber whatever the interpreter is running. Generator.__next__
+        # puts the caller's environment back instead.
+        previous = self._environment
+        self._environment = environment
+        for statement in statements:
+            if self._suspends(statement):
+                yield from self._execute_suspendable(statement)
+            else:
+                self._execute(statement)
+        self._environment = previous
+
+    def _execute_suspendable(self, stmt: "Stmt"):
+        """Runs a statement that contains a yield, as a Python generator."""
+        kind = type(stmt)
+        if kind is Yield_stmt:
+            yield None if stmt.value is None else self._evaluate(stmt.value)
+        elif kind is Block_stmt:
+            yield from self._execute_suspendable_block(stmt.statements, Environment(self._environment))
+        elif kind is If_stmt:
+            if self._is_truthy(self._evaluate(stmt.condition)):
+                branch = stmt.then_branch
+            else:
+                branch = stmt.else_branch
+            if branch is not None:
+                if self._suspends(branch):
+                    yield from self._execute_suspendable(branch)
+                else:
+                    self._execute(branch)
+        elif kind is While_stmt:
+            suspends = self._suspends(stmt.body)
+            while self._is_truthy(self._evaluate(stmt.condition)):
+                if suspends:
+                    yield from self._execute_suspendable(stmt.body)
+                else:
+                    self._execute(stmt.body)
+        elif kind is Foreach_stmt:
+            items = self._iterate(self._evaluate(stmt.iterable), stmt.name)
+            suspends = self._suspends(stmt.body)
+            name = stmt.name.lexeme
+            previous = self._environment
+            environment = Environment(previous)
+            self._environment = environment
+            try:
+                for item in items:
+                    environment.define(name, item)
+                    if suspends:
+                        yield from self._execute_suspendable(stmt.body)
+                    else:
+                        self._execute(stmt.body)
+            except NativeError as e:
+                # raised by a lazy native while producing the next item, as in visit_foreach_stmt
+                raise RuntimeException(stmt.name, e.message)
+            self._environment = previous
+    
     def visit_variable_expr(self, expr: "Expr"):
         return self._look_up_variable(expr.name, expr)
     
@@ -136,7 +325,10 @@ class Interpreter(BaseVisitor, StmtVisitor):
     
     def visit_print_stmt(self, stmt: "Print_stmt"):
         value = self._evaluate(stmt.expression)
-        print(self._stringify(value))
+        if type(value) is List and len(value.items) > STREAM_THRESHOLD:
+            self.output.write_list(value.items)
+        else:
+            self.output.write_line(self._stringify(value))
         return None
     
     def visit_return_stmt(self, stmt: "Return_stmt"):
@@ -165,7 +357,22 @@ class Interpreter(BaseVisitor, StmtVisitor):
             raise RuntimeException(expr.name, "Only instances have fields.")
         
         value = self._evaluate(expr.value)
+        shape = object_.shape
+        cache = self._shape_caches.get(expr)
+        if cache is not None and cache[0] is shape:
+            if cache[2] is None:
+                object_.values[cache[1]] = value
+            else:
+                object_.shape = cache[2]
+                object_.values.append(value)
+            return value
+
         object_.set(expr.name, value)
+        slot = shape.slots.get(expr.name.lexeme)
+        if slot is None:
+            self._shape_caches[expr] = (shape, len(object_.values) - 1, object_.shape)
+        else:
+            self._shape_caches[expr] = (shape, slot, None)
         return value
     
     def visit_super_expr(self, expr: "Super_expr"):
@@ -185,7 +392,9 @@ class Interpreter(BaseVisitor, StmtVisitor):
 
         if expr.operator.type == TokenType.MINUS:
             self._check_number_operand(expr.operator, right)
-            return -float(right)
+            if right == 0:
+                return -float(right)
+            return -right
         
         elif expr.operator.type == TokenType.BANG:
             return not self._is_truthy(right)
@@ -197,40 +406,50 @@ class Interpreter(BaseVisitor, StmtVisitor):
         right = self._evaluate(expr.right)
 
         if expr.operator.type == TokenType.PLUS:
-            if isinstance(right, float) and isinstance(left, float):
-                return float(left) + float(right)
-            elif isinstance(right, str) and isinstance(left, str):
-                return str(left) + str(right)
+            if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+                result = left + right
+                if -MAX_EXACT_INT <= result <= MAX_EXACT_INT: return result
+                return float(result)
+            elif isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+                return concat(left, right)
             else:
                 raise RuntimeException(expr.operator, "Operands must be two numbers or two strings")
         
         elif expr.operator.type == TokenType.MINUS:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) - float(right)
+            result = left - right
+            if -MAX_EXACT_INT <= result <= MAX_EXACT_INT: return result
+            return float(result)
         
         elif expr.operator.type == TokenType.SLASH:
             self._check_number_operands(expr.operator, left, right)
+            # 0 / -n is -0 for doubles, so only exact quotients that aren't that stay ints
+            if type(left) is int and type(right) is int and right and left % right == 0 and (left or right > 0):
+                return left // right
             return float(left) / float(right)
         
         elif expr.operator.type == TokenType.STAR:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) * float(right)
+            product = left * right
+            if product == 0 and (left < 0 or right < 0):
+                return float(left) * float(right)
+            return exact(product)
         
         elif expr.operator.type == TokenType.GREATER_EQUAL:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) >= float(right)
+            return left >= right
 
         elif expr.operator.type == TokenType.GREATER:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) > float(right)
+            return left > right
         
         elif expr.operator.type == TokenType.LESS_EQUAL:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) <= float(right)
+            return left <= right
         
         elif expr.operator.type == TokenType.LESS:
             self._check_number_operands(expr.operator, left, right)
-            return float(left) < float(right)
+            return left < right
         
         elif expr.operator.type == TokenType.EQUAL_EQUAL:
             return self._is_equal(left, right)
@@ -245,6 +464,12 @@ class Interpreter(BaseVisitor, StmtVisitor):
         arguments = []
         for argument in expr.arguments:
             arguments.append(self._evaluate(argument))
+
+        if type(callee) is PythonNative:
+            try:
+                return callee.invoke(self, arguments)
+            except NativeError as e:
+                raise RuntimeException(expr.paren, e.message)
         
         if not isinstance(callee, Callable):
             raise RuntimeException(expr.paren, "Object is not callable.")
@@ -253,11 +478,27 @@ class Interpreter(BaseVisitor, StmtVisitor):
         if len(arguments) != func.arity:
             raise RuntimeException(expr.paren, f"Expected {func.arity} arguments, but got {len(arguments)}.")
 
-        return func.call(self, arguments)
+        if not isinstance(func, (Function, Class, Len)):
+            # natives only ever see flat strings; len() reads a rope's stored length
+            arguments = [str(arg) if type(arg) is Rope else arg for arg in arguments]
+
+        try:
+            return func.call(self, arguments)
+        except NativeError as e:
+            raise RuntimeException(expr.paren, e.message)
 
     def visit_get_expr(self, expr: "Get_expr"):
         object_ = self._evaluate(expr.object)
         if isinstance(object_, Instance):
+            shape = object_.shape
+            cache = self._shape_caches.get(expr)
+            if cache is not None and cache[0] is shape:
+                return object_.values[cache[1]]
+
+            slot = shape.slots.get(expr.name.lexeme)
+            if slot is not None:
+                self._shape_caches[expr] = (shape, slot)
+                return object_.values[slot]
             return object_.get(expr.name)
         raise RuntimeException(expr.name, "Only instances can have properties.")
     
@@ -265,10 +506,18 @@ class Interpreter(BaseVisitor, StmtVisitor):
         index = self._evaluate(expr.index)
         list_obj = self._evaluate(expr.name)
 
-        if int(index) != index:
-            raise RuntimeException(expr.paren, "List index must be an integer.")
+        if isinstance(list_obj, Map):
+            try:
+                if not list_obj.has(index):
+                    raise RuntimeException(expr.paren, "Undefined key in map.")
+                return list_obj.get(index)
+            except NativeError as e:
+                raise RuntimeException(expr.paren, e.message)
 
-        index = int(index)
+        if not isinstance(index, int):
+            if type(index) is not float or not index.is_integer():
+                raise RuntimeException(expr.paren, "List index must be an integer.")
+            index = int(index)
 
         if not 0 <= index < len(list_obj):
             raise RuntimeException(expr.paren, "List index out of range.")
@@ -279,18 +528,30 @@ class Interpreter(BaseVisitor, StmtVisitor):
         values = []
         for val in expr.values:
             values.append(self._evaluate(val))
+        values = List(values)
         if expr in self._locals.keys():
             self._environment.assign_at(self._locals[expr], expr.name, values)
         else:
             self.globals.assign(expr.name, values)
         return values
 
+    def visit_map_expr(self, expr: "Map_expr"):
+        map_ = Map()
+        for key_expr, value_expr in zip(expr.keys, expr.values):
+            key = self._evaluate(key_expr)
+            value = self._evaluate(value_expr)
+            try:
+                map_.set(key, value)
+            except NativeError as e:
+                raise RuntimeException(expr.brace, e.message)
+        return map_
+
     def visit_list_stmt(self, stmt: "List_stmt"):
         values = []
         for val in stmt.values:
             values.append(self._evaluate(val))
         
-        self._environment.define(stmt.name.lexeme, values)
+        self._environment.define(stmt.name.lexeme, List(values))
     
     def _evaluate(self, expr: "Expr"):
         return expr.accept(self)
@@ -306,20 +567,22 @@ class Interpreter(BaseVisitor, StmtVisitor):
         return a == b
     
     def _check_number_operand(self, operator: Token, operand: t.Any):
-        if isinstance(operand, float): return
+        if type(operand) in NUMBER_TYPES: return
         raise RuntimeException(operator, "Operand must be a number.")
     
     def _check_number_operands(self, operator: Token, left: t.Any, right: t.Any):
-        if isinstance(left, float) and isinstance(right, float): return
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES: return
         raise RuntimeException(operator, "Operands must be numbers.")
     
     def _stringify(self, value: t.Any):
         if value is None: return "nil"
         elif isinstance(value, bool):
             return str(value).lower()
+        elif type(value) is int:
+            return str(value)
         elif isinstance(value, float):
             return str(value).replace(".0", "")
-        elif isinstance(value, list):
+        elif isinstance(value, (List, Map, Vector)):
             return str(value).replace(".0", "")
         else:
             return str(value)
@@ -0,0 +1,136 @@
+import typing as t
+import mmap
+
+from .callable import Callable
+from .files import BUFFER_SIZE, Writer, read_lines, to_text
+from .stream import Stream
+from ..errors import NativeError
+
+
+def _path_argument(value: t.Any, native: str):
+    if not isinstance(value, str):
+        raise NativeError(f"'{native}' expects a file path string.")
+    return value
+
+
+def _writer_argument(value: t.Any, native: str):
+    if not isinstance(value, Writer):
+        raise NativeError(f"'{native}' expects a writer.")
+    if value.closed:
+        raise NativeError(f"'{native}' on a closed writer.")
+    return value
+
+
+class Lines(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        path = _path_argument(arguments[0], "lines")
+        try:
+            # bytes that aren't UTF-8 become U+FFFD rather than failing half way through
+            file = open(path, encoding="utf-8", errors="replace", buffering=BUFFER_SIZE)
+        except OSError as e:
+            raise NativeError(f"Can't open '{path}': {e.strerror}.")
+        return Stream(read_lines(file))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Read_file(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        path = _path_argument(arguments[0], "read_file")
+        try:
+            with open(path, "rb") as file:
+                try:
+                    contents = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                except ValueError:  # empty files can't be mapped
+                    return ""
+                with contents:
+                    # decodes straight out of the mapping, no intermediate bytes copy
+                    return str(contents, "utf-8", "replace")
+        except OSError as e:
+            raise NativeError(f"Can't read '{path}': {e.strerror}.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Open_writer(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        path = _path_argument(arguments[0], "open_writer")
+        try:
+            return Writer(path)
+        except OSError as e:
+            raise NativeError(f"Can't open '{path}': {e.strerror}.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Write(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        writer = _writer_argument(arguments[0], "write")
+        writer.write(to_text(arguments[1]))
+        return None
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Write_line(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        writer = _writer_argument(arguments[0], "write_line")
+        writer.write(to_text(arguments[1]))
+        writer.write("\n")
+        return None
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Flush(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        _writer_argument(arguments[0], "flush").flush()
+        return None
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Close(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        writer = arguments[0]
+        if not isinstance(writer, Writer):
+            raise NativeError("'close' expects a writer.")
+        writer.close()
+        return None
+
+    def __repr__(self):
+        return "<native function>"
@@ -0,0 +1,74 @@
+import typing as t
+import mmap
+import struct
+
+from ..errors import NativeError
+from ..number import exact, normalize
+
+
+class Buffer:
+    """A window onto bytes, a bytearray or an mmap; slicing shares the underlying memory."""
+    __slots__ = ("source", "start", "end", "view")
+
+    def __init__(self, source: t.Any, start: int = 0, end: t.Optional[int] = None):
+        self.source = source
+        self.start = start
+        self.end = len(source) if end is None else end
+        self.view = memoryview(source)[self.start:self.end]
+
+    @classmethod
+    def map_file(cls, path: str):
+        with open(path, "rb") as file:
+            try:
+                return cls(mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ))
+            except ValueError:  # empty files can't be mapped
+                return cls(b"")
+
+    def slice(self, start: int, end: int):
+        start, end, _ = slice(start, end).indices(len(self))
+        return Buffer(self.source, self.start + start, self.start + max(start, end))
+
+    def find(self, needle: t.Any, start: int):
+        if isinstance(needle, Buffer):
+            needle = needle.view
+        elif isinstance(needle, str):
+            needle = needle.encode()
+        start = min(max(start, 0), len(self))
+        # bytes, bytearray and mmap all search in place, the view doesn't copy
+        index = self.source.find(needle, self.start + start, self.end)
+        return index - self.start if index != -1 else -1
+
+    def decode(self):
+        try:
+            return str(self.view, "utf-8")
+        except UnicodeDecodeError as e:
+            raise NativeError(f"Buffer isn't valid UTF-8 at byte {e.start}.")
+
+    def unpack(self, format: str, offset: int):
+        try:
+            values = struct.unpack_from(format, self.view, offset)
+        except struct.error as e:
+            raise NativeError(f"Can't unpack '{format}': {e}.")
+        return [_to_lox(value) for value in values]
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __getitem__(self, index: int):
+        return self.view[index]
+
+    def __iter__(self):
+        return iter(self.view)
+
+    def __str__(self):
+        return f"<buffer {len(self)} bytes>"
+
+
+def _to_lox(value: t.Any):
+    if type(value) is int:
+        return exact(value)
+    elif type(value) is float:
+        return normalize(value)
+    elif type(value) is bytes:
+        return Buffer(value)
+    return value
@@ -5,21 +5,51 @@ from ..lexer.token import Token
 from .callable import Callable, Function
 
 
+class Shape:
+    """Hidden class shared by every instance that gained the same fields in the same order."""
+    __slots__ = ("slots", "_transitions")
+
+    def __init__(self, slots: t.Dict[str, int]):
+        self.slots = slots
+        self._transitions = {}
+
+    def with_field(self, name: str):
+        shape = self._transitions.get(name)
+        if shape is None:
+            slots = dict(self.slots)
+            slots[name] = len(slots)
+            shape = Shape(slots)
+            self._transitions[name] = shape
+        return shape
+
+
+EMPTY_SHAPE = Shape({})
+
+
 class Instance:
+    __slots__ = ("lox_class", "shape", "values")
+
     def __init__(self, lox_class):
         self.lox_class = lox_class
-        self._fields = {}
+        self.shape = EMPTY_SHAPE
+        self.values = []
     
     def get(self, name: Token):
-        if name.lexeme in self._fields.keys():
-            return self._fields[name.lexeme]
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is not None:
+            return self.values[slot]
         
         method = self.lox_class.find_method(name.lexeme)
         if method: return method.bind(self)
         raise RuntimeException(name, f"Undefined property '{name.lexeme}'.")
     
     def set(self, name: Token, value: t.Any):
-        self._fields[name.lexeme] = value
+        slot = self.shape.slots.get(name.lexeme)
+        if slot is None:
+            self.shape = self.shape.with_field(name.lexeme)
+            self.values.append(value)
+        else:
+            self.values[slot] = value
     
     def __str__(self):
         return f"<instance of {self.lox_class.name}>"
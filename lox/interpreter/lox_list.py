@@ -0,0 +1,67 @@
+import typing as t
+from array import array
+
+
+def _pack(values: t.List[t.Any]):
+    kinds = {type(value) for value in values}
+    if kinds <= {int}:
+        return array("q", values)
+    if kinds <= {int, float}:
+        return array("d", values)
+    return values
+
+
+class List:
+    """A Lox list.
+
+    While a list holds only numbers its items live unboxed in an array: 'q'
+    while they are all ints, 'd' once a float shows up. The first element of
+    any other type turns the store into a plain Python list for good.
+    """
+    __slots__ = ("items",)
+
+    def __init__(self, values: t.List[t.Any]):
+        self.items = _pack(values)
+
+    def append(self, value: t.Any):
+        self._store_for(value).append(value)
+
+    def pop(self):
+        return self.items.pop()
+
+    def __setitem__(self, index: int, value: t.Any):
+        self._store_for(value)[index] = value
+
+    def _store_for(self, value: t.Any):
+        items = self.items
+        if type(items) is array:
+            if type(value) is float:
+                if items.typecode == "q":
+                    self.items = array("d", items)
+            elif type(value) is not int:
+                self.items = items.tolist()
+        return self.items
+
+    def __getitem__(self, index: int):
+        return self.items[index]
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __eq__(self, other: t.Any):
+        if not isinstance(other, List):
+            return NotImplemented
+        if type(self.items) is type(other.items):
+            return self.items == other.items
+        return list(self.items) == list(other.items)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self.items))
+
+    def __str__(self):
+        return self.__repr__()
@@ -0,0 +1,96 @@
+import typing as t
+
+from ..errors import NativeError
+from ..number import format_number
+from .lox_class import Instance
+from .rope import Rope
+
+
+class _BoolKey:
+    """Stands in for true/false so they don't collide with the numbers 1 and 0."""
+    __slots__ = ("value",)
+
+    def __init__(self, value: bool):
+        self.value = value
+
+
+_TRUE = _BoolKey(True)
+_FALSE = _BoolKey(False)
+
+
+def _key(value: t.Any):
+    kind = type(value)
+    if kind is str or kind is int or kind is float or value is None or kind is Instance:
+        return value
+    if kind is bool:
+        return _TRUE if value else _FALSE
+    if kind is Rope:
+        return str(value)
+    raise NativeError("Map keys must be strings, numbers, booleans, nil or instances.")
+
+
+def _value_of(key: t.Any):
+    if type(key) is _BoolKey:
+        return key.value
+    return key
+
+
+def _format(value: t.Any):
+    # keys and values are written the way a map literal would spell them
+    if value is None:
+        return "nil"
+    kind = type(value)
+    if kind is bool:
+        return "true" if value else "false"
+    if kind is int or kind is float:
+        return format_number(value)
+    if kind is str or kind is Rope:
+        return f'"{value}"'
+    return str(value)
+
+
+class Map:
+    """A Lox map. Instances are keyed by identity, everything else by value."""
+    __slots__ = ("entries",)
+
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, key: t.Any):
+        return self.entries.get(_key(key))
+
+    def set(self, key: t.Any, value: t.Any):
+        self.entries[_key(key)] = value
+
+    def has(self, key: t.Any):
+        return _key(key) in self.entries
+
+    def delete(self, key: t.Any):
+        key = _key(key)
+        if key not in self.entries:
+            return False
+        del self.entries[key]
+        return True
+
+    def keys(self):
+        return [_value_of(key) for key in self.entries]
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __eq__(self, other: t.Any):
+        if not isinstance(other, Map):
+            return NotImplemented
+        return self.entries == other.entries
+
+    __hash__ = None
+
+    def __repr__(self):
+        entries = (f"{_format(_value_of(key))}: {_format(value)}" for key, value in self.entries.items())
+        return "{" + ", ".join(entries) + "}"
+
+    def __str__(self):
+        return self.__repr__()
@@ -1,7 +1,17 @@
 import typing as t
+import statistics
 import time
 
 from .callable import Callable
+from .lox_list import List
+from .lox_map import Map
+from .vector import Vector
+from .stream import Stream
+from . import lox_buffer
+from .heap import HeapSnapshot
+from ..errors import NativeError
+from ..number import exact, normalize
+from .collection_natives import _call, _integer_argument
 
 
 class Clock(Callable):
@@ -16,12 +26,74 @@ class Clock(Callable):
         return "<native function>"
 
 
+class Perf_counter_ns(Callable):
+    @property
+    def arity(self):
+        return 0
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return exact(time.perf_counter_ns())
+    
+    def __repr__(self):
+        return "<native function>"
+
+
+class Process_time_ns(Callable):
+    @property
+    def arity(self):
+        return 0
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return exact(time.process_time_ns())
+    
+    def __repr__(self):
+        return "<native function>"
+
+
+class Bench(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        function, iterations = arguments
+        if type(iterations) is float and iterations.is_integer():
+            iterations = int(iterations)
+        if type(iterations) is not int or iterations < 1:
+            raise NativeError("'bench' expects a positive number of iterations.")
+
+        # a tenth of the runs again, untimed, so caches are warm when timing starts
+        for _ in range(max(1, iterations // 10)):
+            _call(interpreter, function, [], "bench")
+
+        clock = time.perf_counter_ns
+        times = []
+        for _ in range(iterations):
+            start = clock()
+            _call(interpreter, function, [], "bench")
+            times.append(clock() - start)
+
+        result = Map()
+        result.set("iterations", iterations)
+        result.set("total_ns", exact(sum(times)))
+        result.set("mean_ns", normalize(statistics.mean(times) * 1.0))
+        result.set("median_ns", normalize(statistics.median(times) * 1.0))
+        result.set("min_ns", exact(min(times)))
+        result.set("max_ns", exact(max(times)))
+        result.set("stdev_ns", normalize(statistics.pstdev(times) * 1.0))
+        return result
+    
+    def __repr__(self):
+        return "<native function>"
+
+
 class Input(Callable):
     @property
     def arity(self):
         return 1
     
     def call(self, interpreter, arguments: t.List[t.Any]):
+        interpreter.output.flush()
         return input(arguments[0])
 
     def __repr__(self):
@@ -34,7 +106,10 @@ class String(Callable):
         return 1
     
     def call(self, interpreter, arguments: t.List[t.Any]):
-        return str(arguments[0])
+        value = arguments[0]
+        if type(value) is int:
+            value = float(value)
+        return str(value)
 
     def __repr__(self):
         return "<native function>"
@@ -46,7 +121,7 @@ class Number(Callable):
         return 1
     
     def call(self, interpreter, arguments: t.List[t.Any]):
-        return float(arguments[0])
+        return normalize(float(arguments[0]))
 
     def __repr__(self):
         return "<native function>"
@@ -65,6 +140,14 @@ class Type(Callable):
             return "boolean"
         elif isinstance(obj, str):
             return "string"
+        elif isinstance(obj, Map):
+            return "map"
+        elif isinstance(obj, Vector):
+            return "vec"
+        elif isinstance(obj, Stream):
+            return "iterator"
+        elif isinstance(obj, lox_buffer.Buffer):
+            return "buffer"
         else:
             return "nil"
 
@@ -80,5 +163,189 @@ class Len(Callable):
     def call(self, interpreter, arguments: t.List[t.Any]):
         return len(arguments[0])
 
+    def __repr__(self):
+        return "<native function>"
+
+
+def _map_argument(arguments: t.List[t.Any], native: str):
+    if not isinstance(arguments[0], Map):
+        raise NativeError(f"First argument to '{native}' must be a map.")
+    return arguments[0]
+
+
+class Get(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _map_argument(arguments, "get").get(arguments[1])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Set(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        _map_argument(arguments, "set").set(arguments[1], arguments[2])
+        return arguments[2]
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Has(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _map_argument(arguments, "has").has(arguments[1])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Delete(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _map_argument(arguments, "delete").delete(arguments[1])
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Keys(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return List(_map_argument(arguments, "keys").keys())
+
+    def __repr__(self):
+        return "<native function>"
+
+
+def _buffer_argument(value: t.Any, native: str):
+    if not isinstance(value, lox_buffer.Buffer):
+        raise NativeError(f"'{native}' expects a buffer.")
+    return value
+
+
+class Buffer(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        source = arguments[0]
+        if isinstance(source, str):
+            return lox_buffer.Buffer(bytearray(source.encode()))
+        elif isinstance(source, lox_buffer.Buffer):
+            return lox_buffer.Buffer(bytearray(source.view))
+        elif type(source) in (int, float) and source >= 0:
+            return lox_buffer.Buffer(bytearray(_integer_argument(source, "buffer", "an integer offset")))
+        raise NativeError("'buffer' expects a string, a buffer or a size.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Read_bytes(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        path = arguments[0]
+        if not isinstance(path, str):
+            raise NativeError("'read_bytes' expects a file path string.")
+        try:
+            return lox_buffer.Buffer.map_file(path)
+        except OSError as e:
+            raise NativeError(f"Can't read '{path}': {e.strerror}.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Find(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        haystack, needle = arguments[0], arguments[1]
+        start = _integer_argument(arguments[2], "find", "an integer offset")
+        if isinstance(haystack, str) and isinstance(needle, str):
+            return haystack.find(needle, start)
+        elif isinstance(haystack, lox_buffer.Buffer) and isinstance(needle, (str, lox_buffer.Buffer)):
+            return haystack.find(needle, start)
+        raise NativeError("'find' expects a string or buffer to search and one to look for.")
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Decode(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _buffer_argument(arguments[0], "decode").decode()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Unpack(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        buffer = _buffer_argument(arguments[0], "unpack")
+        format = arguments[1]
+        if not isinstance(format, str):
+            raise NativeError("'unpack' expects a struct format string.")
+        values = buffer.unpack(format, _integer_argument(arguments[2], "unpack", "an integer offset"))
+        return values[0] if len(values) == 1 else List(values)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Heap_snapshot(Callable):
+    @property
+    def arity(self):
+        return 0
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return HeapSnapshot.take(interpreter)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Heap_diff(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        before, after = arguments
+        if not isinstance(before, HeapSnapshot) or not isinstance(after, HeapSnapshot):
+            raise NativeError("'heap_diff' expects two heap snapshots.")
+        return after.diff(before)
+
     def __repr__(self):
         return "<native function>"
\ No newline at end of file
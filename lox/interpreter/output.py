@@ -0,0 +1,95 @@
+import typing as t
+import sys
+
+# Flush once this many characters are waiting.
+BUFFER_SIZE = 1 << 16
+
+# Lists longer than this are printed a chunk of items at a time instead of
+# being formatted into one string first.
+STREAM_THRESHOLD = 1 << 12
+
+FLUSH_POLICIES = ("line", "full")
+
+
+class Output:
+    """Where `print` writes. Text is collected and written out in large chunks.
+
+    With the "line" policy every print is flushed straight away, which is what
+    a terminal wants. With "full" output is flushed once `buffer_size`
+    characters are waiting, before input(), and when `interpret()` returns
+    (`pylox` also flushes at exit). By default the policy is "line" for a
+    terminal and "full" otherwise.
+    """
+
+    def __init__(
+        self,
+        stream: t.Optional[t.TextIO] = None,
+        buffer_size: int = BUFFER_SIZE,
+        flush_policy: t.Optional[str] = None,
+    ):
+        self._stream = stream
+        self._parts = []
+        self._pending = 0
+        self._buffer_size = buffer_size
+        self.flush_policy = flush_policy
+
+    @property
+    def stream(self):
+        # sys.stdout is looked up late so redirecting it after startup still works
+        return self._stream if self._stream is not None else sys.stdout
+
+    @property
+    def buffer_size(self):
+        return self._buffer_size
+
+    @buffer_size.setter
+    def buffer_size(self, size: int):
+        self._buffer_size = size
+        self.flush_policy = self._flush_policy
+
+    @property
+    def flush_policy(self):
+        return self._flush_policy
+
+    @flush_policy.setter
+    def flush_policy(self, policy: t.Optional[str]):
+        if policy is None:
+            isatty = getattr(self.stream, "isatty", None)
+            policy = "line" if isatty is not None and isatty() else "full"
+        if policy not in FLUSH_POLICIES:
+            raise ValueError(f"Unknown flush policy '{policy}'.")
+        self._flush_policy = policy
+        self._limit = 0 if policy == "line" else self._buffer_size
+
+    def write(self, text: str):
+        self._parts.append(text)
+        self._pending += len(text)
+        if self._pending >= self._limit:
+            self.flush()
+
+    def write_line(self, text: str):
+        self._parts.append(text)
+        self._parts.append("\n")
+        self._pending += len(text) + 1
+        if self._pending >= self._limit:
+            self.flush()
+
+    def write_list(self, items: t.Sequence[t.Any]):
+        """Prints a long list the way `_stringify` would, without building the whole string."""
+        self.write("[")
+        for start in range(0, len(items), STREAM_THRESHOLD):
+            if start:
+                self.write(", ")
+            # separators and brackets never contain ".0", so replacing per chunk
+            # gives the same text as replacing across the whole list
+            chunk = items[start:start + STREAM_THRESHOLD]
+            self.write(", ".join(map(repr, chunk)).replace(".0", ""))
+        self.write_line("]")
+
+    def flush(self):
+        if self._parts:
+            text = "".join(self._parts)
+            self._parts.clear()
+            self._pending = 0
+            self.stream.write(text)
+        self.stream.flush()
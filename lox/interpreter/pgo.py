@@ -0,0 +1,412 @@
+"""Profile-guided optimisation, used by `pylox --pgo-record` and `--pgo-use`.
+
+A recording run notes what happened at each site of the script: how often
+each Lox function ran, which way each `if` went, the operand types each
+binary operator saw, and the class and shape of the receiver at each
+property read, property write and call. The profile is saved as JSON,
+keyed by each node's position in the syntax tree.
+
+A later run with the profile prepares the tree before the first statement
+runs:
+
+- the inline shape cache of every property site that saw instances is
+  filled in with the shape it saw most, so the first access already hits;
+- hot comparison, `+`, `-`, `==` and `!=` sites get their own accept()
+  for their operator, which skips the interpreter's chain of operator tests
+  and, for `+`, tries the operand type that was seen most first;
+- hot `if` statements get an accept() that tests for the branch that was
+  usually taken first.
+
+These are shortcuts only: a site that sees something else takes the same
+checks, and raises the same errors, as the plain interpreter. A profile
+recorded for a different script is ignored.
+
+    recorder = RecordingInterpreter()
+    recorder.interpret(statements)
+    recorder.dump("script.pgo")
+
+    guided = GuidedInterpreter(load("script.pgo"))
+    guided.interpret(statements)
+"""
+import typing as t
+import hashlib
+import json
+import sys
+from collections import Counter
+
+from .interpreter import Interpreter
+from .callable import Function
+from .lox_class import Class, Instance, EMPTY_SHAPE
+from .output import Output
+from .rope import Rope, concat
+from ..errors import RuntimeException
+from ..lexer.token_type import TokenType
+from ..number import MAX_EXACT_INT, NUMBER_TYPES
+from ..parser.expr import Binary_expr, Call_expr, Get_expr, Set_expr
+from ..parser.stmt import Stmt, If_stmt
+from ..parser.nodes import walk
+
+VERSION = 1
+
+# sites that ran fewer times than this are left alone
+MIN_HITS = 2
+
+# node type -> the counters GuidedInterpreter reads from its sites, and their types
+_SITE_COUNTERS = {
+    "Binary_expr": {"types": dict},
+    "If_stmt": {"taken": int, "not_taken": int},
+    "Get_expr": {"shapes": dict},
+    "Set_expr": {"shapes": dict},
+}
+
+_execute_block = Interpreter._execute_block
+
+_COMPARISONS = {
+    TokenType.LESS: lambda left, right: left < right,
+    TokenType.LESS_EQUAL: lambda left, right: left <= right,
+    TokenType.GREATER: lambda left, right: left > right,
+    TokenType.GREATER_EQUAL: lambda left, right: left >= right,
+}
+
+
+def fingerprint(statements: t.List[Stmt]):
+    """A hash of the tree's node types in order, so a profile only applies to the script it came from."""
+    digest = hashlib.sha1()
+    for node in walk(statements):
+        digest.update(type(node).__name__.encode())
+        digest.update(b";")
+    return digest.hexdigest()
+
+
+def load(path: str):
+    with open(path) as file:
+        profile = json.load(file)
+    if not isinstance(profile, dict) or profile.get("version") != VERSION:
+        raise ValueError(f"'{path}' is not a version {VERSION} profile.")
+    sites = profile.get("sites")
+    if not isinstance(sites, dict) or not all(_valid_site(site) for site in sites.values()):
+        raise ValueError(f"'{path}' is missing sites or site counters.")
+    return profile
+
+
+def _valid_site(site: t.Any):
+    if not isinstance(site, dict) or not isinstance(site.get("node"), str):
+        return False
+    for name, kind in _SITE_COUNTERS.get(site["node"], {}).items():
+        counter = site.get(name)
+        if type(counter) is not kind:
+            return False
+        if kind is dict and not all(type(count) is int for count in counter.values()):
+            return False
+    return True
+
+
+def _type_name(value: t.Any):
+    if isinstance(value, Instance):
+        return value.lox_class.name
+    return type(value).__name__
+
+
+def _observe(node, record: t.Callable[[t.Any], None]):
+    # passes every value the node evaluates to through `record`
+    accept = node.accept
+
+    def observed(visitor):
+        value = accept(visitor)
+        record(value)
+        return value
+
+    node.accept = observed
+
+
+def _jsonable(site: dict):
+    # shapes are counted as objects while recording and saved as their field names
+    shapes = site.get("shapes")
+    if not shapes:
+        return site
+    return {**site, "shapes": {",".join(shape.slots): count for shape, count in shapes.items()}}
+
+
+class RecordingInterpreter(Interpreter):
+    """Runs a script while counting what each site sees; see the module docstring."""
+
+    def __init__(self, output: t.Optional[Output] = None):
+        super().__init__(output)
+        # node index in the tree -> what was seen there
+        self.sites = {}
+        # "name:line" -> calls
+        self.functions = Counter()
+        self._fingerprint = None
+        # nodes already wrapped, so running the same tree again doesn't wrap them twice
+        self._instrumented = set()
+
+    def interpret(self, statements: t.List[Stmt]):
+        self._instrument(statements)
+        return super().interpret(statements)
+
+    def interpret_records(self, statements: t.List[Stmt], *args, **kwargs):
+        self._instrument(statements)
+        return super().interpret_records(statements, *args, **kwargs)
+
+    def _instrument(self, statements: t.List[Stmt]):
+        self._fingerprint = fingerprint(statements)
+        for index, node in enumerate(walk(statements)):
+            if node in self._instrumented:
+                continue
+            self._instrumented.add(node)
+            kind = type(node)
+            if kind is Binary_expr:
+                self._record_operands(index, node)
+            elif kind is If_stmt:
+                self._record_branches(index, node)
+            elif kind is Get_expr or kind is Set_expr:
+                self._record_receivers(index, node, node.object)
+            elif kind is Call_expr:
+                self._record_receivers(index, node, node.callee)
+
+    def _site(self, index: int, node, **counters):
+        site = self.sites[index] = {"node": type(node).__name__, **counters}
+        return site
+
+    def _record_operands(self, index: int, node: Binary_expr):
+        types = Counter()
+        self._site(index, node, operator=node.operator.lexeme, types=types)
+        # left operand types of the evaluations of this node that are under way;
+        # the right operand can re-enter the node through a recursive call
+        lefts = []
+
+        def record_left(value):
+            lefts.append(_type_name(value))
+
+        def record_right(value):
+            types[f"{lefts[-1]},{_type_name(value)}"] += 1
+
+        _observe(node.left, record_left)
+        _observe(node.right, record_right)
+
+        accept = node.accept
+
+        def evaluated(visitor):
+            depth = len(lefts)
+            try:
+                return accept(visitor)
+            finally:
+                # drop this evaluation's left type, even if an operand raised
+                del lefts[depth:]
+
+        node.accept = evaluated
+
+    def _record_branches(self, index: int, node: If_stmt):
+        site = self._site(index, node, taken=0, not_taken=0)
+
+        def record(value):
+            if self._is_truthy(value):
+                site["taken"] += 1
+            else:
+                site["not_taken"] += 1
+
+        _observe(node.condition, record)
+
+    def _record_receivers(self, index: int, node, receiver):
+        classes = Counter()
+        shapes = Counter()
+        self._site(index, node, classes=classes, shapes=shapes)
+
+        def record(value):
+            if isinstance(value, Instance):
+                shapes[value.shape] += 1
+            elif isinstance(value, Function):
+                classes[f"fun {value.declaration.name.lexeme}"] += 1
+                return
+            elif isinstance(value, Class):
+                classes[f"class {value.name}"] += 1
+                return
+            classes[_type_name(value)] += 1
+
+        _observe(receiver, record)
+
+    def _execute_block(self, statements: t.List[Stmt], environment):
+        function = self._functions.get(id(statements))
+        if function is not None:
+            _, name, declaration = function
+            self.functions[f"{name}:{declaration.name.line}"] += 1
+        return _execute_block(self, statements, environment)
+
+    def as_dict(self):
+        return {
+            "version": VERSION,
+            "fingerprint": self._fingerprint,
+            "functions": dict(self.functions.most_common()),
+            "sites": {str(index): _jsonable(site) for index, site in self.sites.items()},
+        }
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=1)
+
+
+class GuidedInterpreter(Interpreter):
+    """Runs a script with the shortcuts a recorded profile calls for; see the module docstring."""
+
+    def __init__(self, profile: dict, output: t.Optional[Output] = None, min_hits: int = MIN_HITS):
+        super().__init__(output)
+        self.profile = profile
+        self.min_hits = min_hits
+        # kind of shortcut -> sites it was applied to
+        self.applied = Counter()
+
+    def interpret(self, statements: t.List[Stmt]):
+        self._apply(statements)
+        return super().interpret(statements)
+
+    def interpret_records(self, statements: t.List[Stmt], *args, **kwargs):
+        self._apply(statements)
+        return super().interpret_records(statements, *args, **kwargs)
+
+    def _apply(self, statements: t.List[Stmt]):
+        if self.profile.get("fingerprint") != fingerprint(statements):
+            sys.stderr.write("The profile was recorded for a different script, ignoring it.\n")
+            return
+        sites = self.profile["sites"]
+        for index, node in enumerate(walk(statements)):
+            site = sites.get(str(index))
+            if site is None or site["node"] != type(node).__name__:
+                continue
+            kind = type(node)
+            if kind is Get_expr or kind is Set_expr:
+                self._prefill_cache(node, site)
+            elif kind is Binary_expr:
+                self._specialise_binary(node, site)
+            elif kind is If_stmt:
+                self._specialise_if(node, site)
+
+    def _prefill_cache(self, node, site: dict):
+        if not site["shapes"]:
+            return
+        fields, _ = Counter(site["shapes"]).most_common(1)[0]
+        shape = EMPTY_SHAPE
+        for field in filter(None, fields.split(",")):
+            shape = shape.with_field(field)
+
+        name = node.name.lexeme
+        slot = shape.slots.get(name)
+        if type(node) is Get_expr:
+            if slot is None:
+                # a method, which the cache doesn't cover
+                return
+            self._shape_caches[node] = (shape, slot)
+        elif slot is None:
+            self._shape_caches[node] = (shape, len(shape.slots), shape.with_field(name))
+        else:
+            self._shape_caches[node] = (shape, slot, None)
+        self.applied["shape caches"] += 1
+
+    def _specialise_binary(self, node: Binary_expr, site: dict):
+        types = Counter(site["types"])
+        if sum(types.values()) < self.min_hits:
+            return
+        operator = node.operator.type
+        if operator in _COMPARISONS:
+            node.accept = _comparison(node, _COMPARISONS[operator])
+        elif operator is TokenType.MINUS:
+            node.accept = _minus(node)
+        elif operator is TokenType.PLUS:
+            operands, _ = types.most_common(1)[0]
+            strings = all(name in ("str", "Rope") for name in operands.split(","))
+            node.accept = _plus(node, strings)
+        elif operator is TokenType.EQUAL_EQUAL or operator is TokenType.BANG_EQUAL:
+            node.accept = _equality(node, operator is TokenType.EQUAL_EQUAL)
+        else:
+            return
+        self.applied["binary operators"] += 1
+
+    def _specialise_if(self, node: If_stmt, site: dict):
+        if site["taken"] + site["not_taken"] < self.min_hits:
+            return
+        node.accept = _branch(node, site["taken"] >= site["not_taken"])
+        self.applied["if statements"] += 1
+
+
+# The accept() replacements below do what Interpreter.visit_binary_expr and
+# visit_if_stmt do for one operator or one branch order.
+
+def _comparison(node: Binary_expr, compare: t.Callable[[t.Any, t.Any], bool]):
+    left_operand, right_operand, operator = node.left, node.right, node.operator
+
+    def accept(interpreter):
+        left = interpreter._evaluate(left_operand)
+        right = interpreter._evaluate(right_operand)
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            return compare(left, right)
+        interpreter._check_number_operands(operator, left, right)
+
+    return accept
+
+
+def _minus(node: Binary_expr):
+    left_operand, right_operand, operator = node.left, node.right, node.operator
+
+    def accept(interpreter):
+        left = interpreter._evaluate(left_operand)
+        right = interpreter._evaluate(right_operand)
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            result = left - right
+            if -MAX_EXACT_INT <= result <= MAX_EXACT_INT: return result
+            return float(result)
+        interpreter._check_number_operands(operator, left, right)
+
+    return accept
+
+
+def _plus(node: Binary_expr, strings_first: bool):
+    left_operand, right_operand, operator = node.left, node.right, node.operator
+
+    def accept(interpreter):
+        left = interpreter._evaluate(left_operand)
+        right = interpreter._evaluate(right_operand)
+        if strings_first and isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+            return concat(left, right)
+        if type(left) in NUMBER_TYPES and type(right) in NUMBER_TYPES:
+            result = left + right
+            if -MAX_EXACT_INT <= result <= MAX_EXACT_INT: return result
+            return float(result)
+        if isinstance(left, (str, Rope)) and isinstance(right, (str, Rope)):
+            return concat(left, right)
+        raise RuntimeException(operator, "Operands must be two numbers or two strings")
+
+    return accept
+
+
+def _equality(node: Binary_expr, equal: bool):
+    left_operand, right_operand = node.left, node.right
+
+    if equal:
+        def accept(interpreter):
+            return interpreter._is_equal(interpreter._evaluate(left_operand), interpreter._evaluate(right_operand))
+    else:
+        def accept(interpreter):
+            return not interpreter._is_equal(interpreter._evaluate(left_operand), interpreter._evaluate(right_operand))
+
+    return accept
+
+
+def _branch(node: If_stmt, usually_taken: bool):
+    condition, then_branch, else_branch = node.condition, node.then_branch, node.else_branch
+
+    if usually_taken:
+        def accept(interpreter):
+            value = interpreter._evaluate(condition)
+            if value is True or (value is not False and value is not None):
+                interpreter._execute(then_branch)
+            elif else_branch is not None:
+                interpreter._execute(else_branch)
+    else:
+        def accept(interpreter):
+            value = interpreter._evaluate(condition)
+            if value is False or value is None:
+                if else_branch is not None:
+                    interpreter._execute(else_branch)
+            else:
+                interpreter._execute(then_branch)
+
+    return accept
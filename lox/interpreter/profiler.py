@@ -0,0 +1,221 @@
+"""A Lox-level profiler, used by `pylox --profile`.
+
+Time is attributed to Lox functions and, with `lines=True`, to source lines
+instead of to the visitor methods cProfile would show. Function entry is
+spotted in `_execute_block` by the identity of the body being run, so the
+plain Interpreter carries no profiling code at all.
+
+    profiler = ProfilingInterpreter("script.lox", lines=True)
+    profiler.interpret(statements)
+    profiler.report()
+    profiler.dump("script.prof")  # pstats format, or JSON for a .json path
+"""
+import typing as t
+import json
+import marshal
+import sys
+import time
+from pathlib import Path
+
+from .interpreter import Interpreter
+from .output import Output
+from ..parser.nodes import line_of
+from ..parser.stmt import Stmt, Block_stmt, Function_stmt, Class_stmt
+
+TOP_LEVEL = "<script>"
+
+_execute_block = Interpreter._execute_block
+
+
+class FunctionStats:
+    __slots__ = ("key", "calls", "primitive_calls", "self_time", "total_time", "callers", "active")
+
+    def __init__(self, key: t.Tuple[str, int, str]):
+        self.key = key
+        self.calls = 0
+        # calls that weren't recursive, so total_time counts each stretch once
+        self.primitive_calls = 0
+        self.self_time = 0.0
+        self.total_time = 0.0
+        # caller FunctionStats -> [calls, primitive calls, self time, total time]
+        self.callers = {}
+        # how many calls to this function are running right now
+        self.active = 0
+
+
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, path: str = TOP_LEVEL, lines: bool = False, output: t.Optional[Output] = None):
+        super().__init__(output)
+        self.path = path
+        self.lines = lines
+        # (path, line, name) -> FunctionStats
+        self.functions = {}
+        # line -> [hits, self time]
+        self.line_times = {}
+        # id of a function body -> its FunctionStats
+        self._bodies = {}
+        self._statement_lines = {}
+        self._stack = []
+        self._nested_calls = 0.0
+        self._nested_lines = 0.0
+        self._clock = time.perf_counter
+        if lines:
+            self.__class__ = LineProfilingInterpreter
+
+    def interpret(self, statements: t.List[Stmt]):
+        return self._profile_top_level(super().interpret, statements)
+
+    def interpret_records(self, statements: t.List[Stmt], *args, **kwargs):
+        return self._profile_top_level(super().interpret_records, statements, *args, **kwargs)
+
+    def _profile_top_level(self, run: t.Callable, *args, **kwargs):
+        stats = self._stats((self.path, 0, TOP_LEVEL))
+        self._stack.append(stats)
+        self._nested_calls = 0.0
+        start = self._clock()
+        try:
+            return run(*args, **kwargs)
+        finally:
+            elapsed = self._clock() - start
+            self._stack.pop()
+            stats.calls += 1
+            stats.primitive_calls += 1
+            stats.self_time += elapsed - self._nested_calls
+            stats.total_time += elapsed
+
+    def _stats(self, key: t.Tuple[str, int, str]):
+        stats = self.functions.get(key)
+        if stats is None:
+            stats = self.functions[key] = FunctionStats(key)
+        return stats
+
+    def visit_function_stmt(self, stmt: Function_stmt):
+        self._bodies[id(stmt.body)] = self._stats((self.path, stmt.name.line, stmt.name.lexeme))
+        return super().visit_function_stmt(stmt)
+
+    def visit_class_stmt(self, stmt: Class_stmt):
+        for method in stmt.methods:
+            name = f"{stmt.name.lexeme}.{method.name.lexeme}"
+            self._bodies[id(method.body)] = self._stats((self.path, method.name.line, name))
+        return super().visit_class_stmt(stmt)
+
+    def _execute_block(self, statements: t.List[Stmt], environment):
+        stats = self._bodies.get(id(statements))
+        if stats is None:
+            return _execute_block(self, statements, environment)
+
+        caller = self._stack[-1] if self._stack else None
+        recursive = stats.active > 0
+        stats.active += 1
+        self._stack.append(stats)
+        outer = self._nested_calls
+        self._nested_calls = 0.0
+        start = self._clock()
+        try:
+            return _execute_block(self, statements, environment)
+        finally:
+            elapsed = self._clock() - start
+            own = elapsed - self._nested_calls
+            self._nested_calls = outer + elapsed
+            self._stack.pop()
+            stats.active -= 1
+
+            stats.calls += 1
+            stats.self_time += own
+            edge = stats.callers.get(caller)
+            if edge is None:
+                edge = stats.callers[caller] = [0, 0, 0.0, 0.0]
+            edge[0] += 1
+            edge[2] += own
+            if not recursive:
+                stats.primitive_calls += 1
+                stats.total_time += elapsed
+                edge[1] += 1
+                edge[3] += elapsed
+
+    def _execute_timed(self, statement: Stmt):
+        if type(statement) is Block_stmt:
+            # its statements are timed on their own lines
+            return statement.accept(self)
+
+        line = self._statement_lines.get(statement)
+        if line is None:
+            line = self._statement_lines[statement] = line_of(statement) or 0
+        outer = self._nested_lines
+        self._nested_lines = 0.0
+        start = self._clock()
+        try:
+            return statement.accept(self)
+        finally:
+            elapsed = self._clock() - start
+            entry = self.line_times.get(line)
+            if entry is None:
+                entry = self.line_times[line] = [0, 0.0]
+            entry[0] += 1
+            entry[1] += elapsed - self._nested_lines
+            self._nested_lines = outer + elapsed
+
+    def report(self, stream: t.TextIO = sys.stderr, limit: int = 20):
+        """Writes the hottest functions, and lines if they were tracked, sorted by self time."""
+        functions = sorted(self.functions.items(), key=lambda item: item[1].self_time, reverse=True)
+        stream.write(f"{'calls':>10} {'self s':>10} {'total s':>10}  function\n")
+        for (_, line, name), stats in functions[:limit]:
+            where = f"{name} (line {line})" if line else name
+            stream.write(f"{stats.calls:>10} {stats.self_time:>10.4f} {stats.total_time:>10.4f}  {where}\n")
+
+        if self.lines:
+            source = self._source_lines()
+            lines = sorted(self.line_times.items(), key=lambda item: item[1][1], reverse=True)
+            stream.write(f"\n{'hits':>10} {'self s':>10}  line\n")
+            for line, (hits, self_time) in lines[:limit]:
+                text = source[line - 1].strip() if 0 < line <= len(source) else ""
+                stream.write(f"{hits:>10} {self_time:>10.4f}  {line:>5}: {text}\n")
+
+    def _source_lines(self):
+        try:
+            return Path(self.path).read_text().splitlines()
+        except OSError:
+            return []
+
+    def dump(self, path: str):
+        """Saves the profile as JSON for a .json path, otherwise in pstats' marshal format."""
+        if path.endswith(".json"):
+            with open(path, "w") as file:
+                json.dump(self.as_dict(), file, indent=2)
+            return
+
+        stats = {}
+        for key, entry in self.functions.items():
+            callers = {
+                caller.key: tuple(edge) for caller, edge in entry.callers.items() if caller is not None
+            }
+            stats[key] = (entry.primitive_calls, entry.calls, entry.self_time, entry.total_time, callers)
+        with open(path, "wb") as file:
+            marshal.dump(stats, file)
+
+    def as_dict(self):
+        return {
+            "functions": [
+                {
+                    "name": name,
+                    "line": line,
+                    "calls": stats.calls,
+                    "self_time": stats.self_time,
+                    "total_time": stats.total_time,
+                }
+                for (_, line, name), stats in self.functions.items()
+            ],
+            "lines": [
+                {"line": line, "hits": hits, "self_time": self_time}
+                for line, (hits, self_time) in sorted(self.line_times.items())
+            ],
+        }
+
+
+class LineProfilingInterpreter(ProfilingInterpreter):
+    """What a ProfilingInterpreter with `lines=True` becomes: every statement is timed.
+
+    The timed _execute lives on a class rather than on the instance so that
+    hooks, which subclass the interpreter's class, still wrap it.
+    """
+    _execute = ProfilingInterpreter._execute_timed
@@ -27,6 +27,7 @@ class Resolver(BaseVisitor, StmtVisitor):
         self._scopes = []
         self._current_function = FunctionType.NONE
         self._current_class = ClassType.NONE
+        self._in_generator = False
     
     def visit_var_stmt(self, stmt: "Var_stmt"):
         self._declare(stmt.name)
@@ -97,12 +98,15 @@ class Resolver(BaseVisitor, StmtVisitor):
         self._declare(stmt.name)
         self._define(stmt.name)
 
+        self._interpreter.resolve_function(stmt, stmt.name.lexeme)
         self._resolve_function(stmt, FunctionType.FUNCTION)
         return None
     
     def _resolve_function(self, function: Function_stmt, type: FunctionType):
         enclosing_function = self._current_function
+        enclosing_generator = self._in_generator
         self._current_function = type
+        self._in_generator = function.is_generator
         self._begin_scope()
         for param in function.params:
             self._declare(param)
@@ -110,6 +114,7 @@ class Resolver(BaseVisitor, StmtVisitor):
         self.resolve(function.body)
         self._end_scope()
         self._current_function = enclosing_function
+        self._in_generator = enclosing_generator
     
     def visit_expression_stmt(self, stmt: "Expression_stmt"):
         self.resolve(stmt.expression)
@@ -132,6 +137,17 @@ class Resolver(BaseVisitor, StmtVisitor):
         if stmt.value is not None:
             if self._current_function == FunctionType.INITIALIZER:
                 parse_error(stmt.keyword, "Can't return a value from an initializer.")
+            if self._in_generator:
+                parse_error(stmt.keyword, "Can't return a value from a generator.")
+            self.resolve(stmt.value)
+        return None
+
+    def visit_yield_stmt(self, stmt: "Yield_stmt"):
+        if self._current_function == FunctionType.NONE:
+            parse_error(stmt.keyword, "Can't yield from top-level code.")
+        elif self._current_function == FunctionType.INITIALIZER:
+            parse_error(stmt.keyword, "Can't yield from an initializer.")
+        if stmt.value is not None:
             self.resolve(stmt.value)
         return None
     
@@ -157,6 +173,7 @@ class Resolver(BaseVisitor, StmtVisitor):
             declaration = FunctionType.METHOD
             if method.name.lexeme == "init":
                 declaration = FunctionType.INITIALIZER
+            self._interpreter.resolve_function(method, f"{stmt.name.lexeme}.{method.name.lexeme}")
             self._resolve_function(method, declaration)
         
         self._end_scope()
@@ -169,6 +186,15 @@ class Resolver(BaseVisitor, StmtVisitor):
         self.resolve(stmt.body)
         return None
     
+    def visit_foreach_stmt(self, stmt: "Foreach_stmt"):
+        self.resolve(stmt.iterable)
+        self._begin_scope()
+        self._declare(stmt.name)
+        self._define(stmt.name)
+        self.resolve(stmt.body)
+        self._end_scope()
+        return None
+    
     def visit_binary_expr(self, expr: "Binary_expr"):
         self.resolve(expr.left)
         self.resolve(expr.right)
@@ -209,6 +235,12 @@ class Resolver(BaseVisitor, StmtVisitor):
     def visit_literal_expr(self, expr: "Literal_expr"):
         return None
     
+    def visit_map_expr(self, expr: "Map_expr"):
+        for key, value in zip(expr.keys, expr.values):
+            self.resolve(key)
+            self.resolve(value)
+        return None
+
     def visit_logical_expr(self, expr: "Logical_expr"):
         self.resolve(expr.left)
         self.resolve(expr.right)
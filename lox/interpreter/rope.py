@@ -0,0 +1,85 @@
+import typing as t
+
+# Concatenations shorter than this stay plain str; copying them is cheaper
+# than keeping a rope around.
+ROPE_MIN_LENGTH = 256
+
+
+class Rope:
+    """A Lox string produced by `+` that is only joined when someone reads it.
+
+    Ropes append into a shared parts buffer and remember how many parts belong
+    to them, so `s = s + piece` in a loop is amortised O(1). Appending to an
+    older rope whose buffer has already grown copies its own prefix first.
+    """
+    __slots__ = ("_parts", "_count", "_length", "_flat")
+
+    def __init__(self, parts: t.List[str], length: int):
+        self._parts = parts
+        self._count = len(parts)
+        self._length = length
+        self._flat = None
+
+    def concat(self, other: str):
+        parts = self._parts
+        if len(parts) != self._count:
+            parts = parts[:self._count]
+        parts.append(other)
+        return Rope(parts, self._length + len(other))
+
+    def __str__(self):
+        if self._flat is None:
+            parts = self._parts
+            if len(parts) != self._count:
+                parts = parts[:self._count]
+            self._flat = "".join(parts)
+        return self._flat
+
+    def __repr__(self):
+        return repr(self.__str__())
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index: int):
+        return self.__str__()[index]
+
+    def __eq__(self, other: t.Any):
+        if isinstance(other, (str, Rope)):
+            return self._length == len(other) and self.__str__() == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.__str__())
+
+    # ropes end up inside lists and maps unflattened, so natives that order
+    # items compare them as the strings they stand for
+    def __lt__(self, other: t.Any):
+        if isinstance(other, (str, Rope)):
+            return self.__str__() < str(other)
+        return NotImplemented
+
+    def __le__(self, other: t.Any):
+        if isinstance(other, (str, Rope)):
+            return self.__str__() <= str(other)
+        return NotImplemented
+
+    def __gt__(self, other: t.Any):
+        if isinstance(other, (str, Rope)):
+            return self.__str__() > str(other)
+        return NotImplemented
+
+    def __ge__(self, other: t.Any):
+        if isinstance(other, (str, Rope)):
+            return self.__str__() >= str(other)
+        return NotImplemented
+
+
+def concat(left: t.Union[str, Rope], right: t.Union[str, Rope]):
+    if type(right) is Rope:
+        right = str(right)
+    if type(left) is Rope:
+        return left.concat(right)
+    if len(left) + len(right) < ROPE_MIN_LENGTH:
+        return left + right
+    return Rope([left, right], len(left) + len(right))
@@ -0,0 +1,111 @@
+"""A sampling profiler that records Lox call stacks, used by `pylox --sample`.
+
+A background thread wakes every `interval` seconds and reads the Lox call
+stack off the interpreter's own Python frames: each `Function.call` frame
+is a Lox call, and the innermost frame that executes a statement under it
+says which line that call is on. The interpreter itself does no extra work per
+call, so the cost is only the sampling. Samples are written in the
+collapsed-stack format flamegraph.pl and speedscope read:
+
+    <script>:12;main:4;fib:7 153
+"""
+import typing as t
+import sys
+import threading
+from collections import Counter
+
+from .callable import Function
+from .interpreter import Interpreter
+from .profiler import ProfilingInterpreter
+from .hooks import _Instrumented
+from .stream import Generator
+from ..parser.nodes import line_of
+
+DEFAULT_INTERVAL = 0.005
+
+TOP_LEVEL = "<script>"
+
+_CALL = Function.call.__code__
+_RESUME = Generator.__next__.__code__
+# the functions that execute a statement -> the name of their statement argument;
+# --profile, --profile-lines and hooks run statements through their own overrides
+_STATEMENT_CODES = {
+    Interpreter._execute.__code__: "statement",
+    Interpreter._execute_suspendable.__code__: "stmt",
+    ProfilingInterpreter._execute_timed.__code__: "statement",
+    _Instrumented._execute.__code__: "statement",
+    _Instrumented._execute_suspendable.__code__: "statement",
+}
+
+
+class Sampler:
+    def __init__(self, interval: float = DEFAULT_INTERVAL):
+        self.interval = interval
+        # collapsed stack -> number of samples that saw it
+        self.samples = Counter()
+        self._lines = {}
+        self._target = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Starts sampling the calling thread."""
+        self._target = threading.get_ident()
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="lox-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.samples[self._stack(frame)] += 1
+            del frame
+
+    def _stack(self, frame):
+        names = []
+        line = None
+        while frame is not None:
+            code = frame.f_code
+            local = _STATEMENT_CODES.get(code)
+            if local is not None:
+                if line is None:
+                    line = self._line(frame.f_locals.get(local))
+            elif code is _CALL:
+                names.append(f"{_function_name(frame.f_locals.get('self'))}:{line or 0}")
+                line = None
+            elif code is _RESUME:
+                generator = frame.f_locals.get("self")
+                names.append(f"{getattr(generator, '_name', '?')}:{line or 0}")
+                line = None
+            frame = frame.f_back
+        names.append(f"{TOP_LEVEL}:{line or 0}")
+        return ";".join(reversed(names))
+
+    def _line(self, statement: t.Any):
+        line = self._lines.get(statement)
+        if line is None and statement is not None:
+            line = self._lines[statement] = line_of(statement) or 0
+        return line
+
+    def write_collapsed(self, stream: t.TextIO):
+        for stack, count in sorted(self.samples.items()):
+            stream.write(f"{stack} {count}\n")
+
+
+def _function_name(function: t.Any):
+    if not isinstance(function, Function):
+        return "?"
+    name = function.declaration.name.lexeme
+    # a bound method's closure holds nothing but `this`
+    this = function.closure._variables.get("this")
+    lox_class = getattr(this, "lox_class", None)
+    if lox_class is not None:
+        return f"{lox_class.name}.{name}"
+    return name
@@ -0,0 +1,112 @@
+"""Runtime counters for `pylox --stats`.
+
+While enabled, the counters are patched into Interpreter's dispatch methods,
+Environment, Function, Instance and Return, so every interpreter in the
+process is counted. disable() puts the original methods back, and nothing is counted
+or slowed down when stats were never enabled.
+
+    stats = RuntimeStats()
+    stats.enable()
+    interpreter.interpret(statements)
+    stats.disable()
+    stats.report()
+"""
+import typing as t
+import json
+import sys
+from collections import Counter
+
+from .callable import Function
+from .environment import Environment
+from .interpreter import Interpreter
+from .lox_class import Instance
+from ..errors import Return
+
+
+class RuntimeStats:
+    def __init__(self):
+        # node class name -> times the interpreter evaluated or executed one
+        self.dispatches = Counter()
+        self.environments = 0
+        self.binds = 0
+        self.instances = 0
+        self.returns = 0
+        # scopes walked by get_at/assign_at -> how often
+        self.distances = Counter()
+        self.global_lookups = 0
+        self._originals = []
+
+    def enable(self):
+        if self._originals:
+            return
+        self._patch(Interpreter, "_evaluate", self._counting_dispatch(Interpreter._evaluate))
+        self._patch(Interpreter, "_execute", self._counting_dispatch(Interpreter._execute))
+        self._patch(Environment, "__init__", self._counting(Environment.__init__, "environments"))
+        self._patch(Function, "bind", self._counting(Function.bind, "binds"))
+        self._patch(Instance, "__init__", self._counting(Instance.__init__, "instances"))
+        self._patch(Return, "__init__", self._counting(Return.__init__, "returns"))
+        self._patch(Environment, "_ancestor", self._measuring_ancestor(Environment._ancestor))
+        self._patch(Environment, "get", self._counting(Environment.get, "global_lookups"))
+
+    def disable(self):
+        for cls, name, original in reversed(self._originals):
+            setattr(cls, name, original)
+        self._originals.clear()
+
+    def _patch(self, cls: type, name: str, replacement: t.Callable):
+        self._originals.append((cls, name, cls.__dict__[name]))
+        setattr(cls, name, replacement)
+
+    def _counting_dispatch(self, dispatch: t.Callable):
+        dispatches = self.dispatches
+
+        def counted(interpreter, node):
+            dispatches[type(node).__name__] += 1
+            return dispatch(interpreter, node)
+        return counted
+
+    def _counting(self, method: t.Callable, counter: str):
+        stats = self
+
+        def counted(*args, **kwargs):
+            setattr(stats, counter, getattr(stats, counter) + 1)
+            return method(*args, **kwargs)
+        return counted
+
+    def _measuring_ancestor(self, ancestor: t.Callable):
+        distances = self.distances
+
+        def measured(environment, distance):
+            distances[distance] += 1
+            return ancestor(environment, distance)
+        return measured
+
+    def as_dict(self):
+        return {
+            "dispatches": dict(self.dispatches.most_common()),
+            "environments": self.environments,
+            "binds": self.binds,
+            "instances": self.instances,
+            "returns": self.returns,
+            "lookup_distances": {str(distance): count for distance, count in sorted(self.distances.items())},
+            "global_lookups": self.global_lookups,
+        }
+
+    def report(self, stream: t.TextIO = sys.stderr):
+        stream.write(f"{'dispatches':>12}  node\n")
+        for name, count in self.dispatches.most_common():
+            stream.write(f"{count:>12}  {name}\n")
+        stream.write("\n")
+        stream.write(f"{self.environments:>12}  environments created\n")
+        stream.write(f"{self.binds:>12}  methods bound\n")
+        stream.write(f"{self.instances:>12}  instances created\n")
+        stream.write(f"{self.returns:>12}  return exceptions raised\n")
+        stream.write(f"{self.global_lookups:>12}  global lookups\n")
+        stream.write(f"\n{'lookups':>12}  scopes walked\n")
+        for distance, count in sorted(self.distances.items()):
+            stream.write(f"{count:>12}  {distance}\n")
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=2)
+
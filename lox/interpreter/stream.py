@@ -0,0 +1,52 @@
+import typing as t
+
+from ..errors import Return
+
+
+class Stream:
+    """A lazy sequence consumed by for-in and the collection natives."""
+
+    def __init__(self, iterator: t.Iterator[t.Any]):
+        self._iterator = iterator
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._iterator)
+
+    def __str__(self):
+        return "<iterator>"
+
+
+class Generator(Stream):
+    """What calling a Lox function that contains `yield` returns.
+
+    The body runs as nested Python generators (see
+    Interpreter._execute_suspendable). The interpreter has a single current
+    environment, so every resume swaps the generator's own environment in and
+    hands the caller's back when the body yields or finishes.
+    """
+
+    def __init__(self, interpreter, declaration, environment):
+        super(Generator, self).__init__(
+            interpreter._execute_suspendable_block(declaration.body, environment)
+        )
+        self._interpreter = interpreter
+        self._name = declaration.name.lexeme
+        self._suspended = environment
+
+    def __next__(self):
+        interpreter = self._interpreter
+        caller = interpreter._environment
+        interpreter._environment = self._suspended
+        try:
+            return next(self._iterator)
+        except Return:
+            raise StopIteration
+        finally:
+            self._suspended = interpreter._environment
+            interpreter._environment = caller
+
+    def __str__(self):
+        return f"<generator {self._name}>"
@@ -0,0 +1,167 @@
+import typing as t
+import operator
+from array import array
+
+from .callable import Callable
+from .collection_natives import _integer_argument
+from .lox_list import List
+from .vector import Vector
+from ..errors import NativeError
+from ..number import is_number
+
+
+def _vector_argument(value: t.Any, native: str):
+    if not isinstance(value, Vector):
+        raise NativeError(f"'{native}' expects a vector.")
+    return value
+
+
+def _operand(value: t.Any, native: str):
+    if not isinstance(value, Vector) and not is_number(value):
+        raise NativeError(f"'{native}' expects a vector or a number.")
+    return value
+
+
+class Vec(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        values = arguments[0]
+        if not isinstance(values, List) or (
+            type(values.items) is not array and not all(is_number(value) for value in values.items)
+        ):
+            raise NativeError("'vec' expects a list of numbers.")
+        return Vector.of(values.items)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_add(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_add")
+        return vector.elementwise(_operand(arguments[1], "vec_add"), operator.add)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_sub(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_sub")
+        return vector.elementwise(_operand(arguments[1], "vec_sub"), operator.sub)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_mul(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_mul")
+        return vector.elementwise(_operand(arguments[1], "vec_mul"), operator.mul)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_div(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_div")
+        return vector.divide(_operand(arguments[1], "vec_div"))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_dot(Callable):
+    @property
+    def arity(self):
+        return 2
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_dot")
+        return vector.dot(_vector_argument(arguments[1], "vec_dot"))
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_sum(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _vector_argument(arguments[0], "vec_sum").sum()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_mean(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _vector_argument(arguments[0], "vec_mean").mean()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_sort(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return _vector_argument(arguments[0], "vec_sort").sorted()
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_slice(Callable):
+    @property
+    def arity(self):
+        return 3
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        vector = _vector_argument(arguments[0], "vec_slice")
+        start = _integer_argument(arguments[1], "vec_slice")
+        end = _integer_argument(arguments[2], "vec_slice")
+        return vector.slice(start, end)
+
+    def __repr__(self):
+        return "<native function>"
+
+
+class Vec_list(Callable):
+    @property
+    def arity(self):
+        return 1
+    
+    def call(self, interpreter, arguments: t.List[t.Any]):
+        return List(_vector_argument(arguments[0], "vec_list").tolist())
+
+    def __repr__(self):
+        return "<native function>"
@@ -0,0 +1,95 @@
+import typing as t
+import operator
+from array import array
+
+from ..errors import NativeError
+
+try:
+    import numpy as np
+except ImportError:  # vec natives fall back to plain Python loops over array('d')
+    np = None
+
+
+class Vector:
+    """An immutable vector of doubles: a NumPy array when available, array('d') otherwise."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: t.Any):
+        self.data = data
+
+    @classmethod
+    def of(cls, values: t.Iterable[t.Any]):
+        if np is not None:
+            return cls(np.array(values, dtype=np.float64))
+        return cls(array("d", values))
+
+    def elementwise(self, other: t.Any, operation: t.Callable[[t.Any, t.Any], t.Any]):
+        if isinstance(other, Vector):
+            if len(other) != len(self):
+                raise NativeError("Vectors must have the same length.")
+            if np is not None:
+                return Vector(operation(self.data, other.data))
+            return Vector(array("d", map(operation, self.data, other.data)))
+        if np is not None:
+            return Vector(operation(self.data, other))
+        return Vector(array("d", (operation(value, other) for value in self.data)))
+
+    def divide(self, other: t.Any):
+        if isinstance(other, Vector):
+            has_zero = (other.data == 0).any() if np is not None else 0 in other.data
+        else:
+            has_zero = other == 0
+        if has_zero:
+            raise NativeError("Division by zero.")
+        return self.elementwise(other, operator.truediv)
+
+    def dot(self, other: "Vector"):
+        if len(other) != len(self):
+            raise NativeError("Vectors must have the same length.")
+        if np is not None:
+            return float(np.dot(self.data, other.data))
+        return sum(map(operator.mul, self.data, other.data))
+
+    def sum(self):
+        if np is not None:
+            return float(np.sum(self.data))
+        return sum(self.data)
+
+    def mean(self):
+        if not len(self):
+            raise NativeError("Mean of an empty vector.")
+        return self.sum() / len(self)
+
+    def sorted(self):
+        if np is not None:
+            return Vector(np.sort(self.data))
+        return Vector(array("d", sorted(self.data)))
+
+    def slice(self, start: int, end: int):
+        # NumPy slices are views; sharing is safe because vectors never change
+        return Vector(self.data[start:end])
+
+    def tolist(self):
+        return self.data.tolist()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index: int):
+        return float(self.data[index])
+
+    def __iter__(self):
+        return iter(self.tolist())
+
+    def __eq__(self, other: t.Any):
+        if not isinstance(other, Vector):
+            return NotImplemented
+        return self.tolist() == other.tolist()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "vec" + repr(self.tolist())
+
+    def __str__(self):
+        return self.__repr__()
@@ -3,6 +3,7 @@ import typing as t
 from .token import Token
 from .token_type import TokenType
 from ..handle_errors import error
+from ..number import normalize
 
 class Scanner:
     def __init__(self, source: str):
@@ -31,6 +32,7 @@ class Scanner:
             TokenType.LEFT_BRACKET,
             TokenType.RIGHT_BRACKET,
             TokenType.COMMA,
+            TokenType.COLON,
             TokenType.DOT,
             TokenType.MINUS,
             TokenType.PLUS,
@@ -91,7 +93,7 @@ class Scanner:
             while self._peek().isdigit():
                 self._advance()
         
-        self._add_token(TokenType.NUMBER, float(self._source[self._start : self._current]))
+        self._add_token(TokenType.NUMBER, normalize(float(self._source[self._start : self._current])))
 
     def _handle_identifier(self):
         keywords = [
@@ -112,6 +114,8 @@ class Scanner:
             TokenType.OR,
             TokenType.NIL,
             TokenType.THIS,
+            TokenType.IN,
+            TokenType.YIELD,
         ]
 
         while self._peek().isalnum() or self._peek() == "_":
@@ -10,6 +10,7 @@ class TokenType(Enum):
     LEFT_BRACKET = "["
     RIGHT_BRACKET = "]"
     COMMA = ","
+    COLON = ":"
     DOT = "."
     MINUS = "-"
     PLUS = "+"
@@ -49,6 +50,8 @@ class TokenType(Enum):
     FALSE = "false"
     NIL = "nil"
     THIS = "this"
+    IN = "in"
+    YIELD = "yield"
     
     EOF = None
     
\ No newline at end of file
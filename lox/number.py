@@ -0,0 +1,38 @@
+import math
+import typing as t
+
+# Lox numbers are doubles. Integral values are kept as Python ints as long as
+# a double could hold them exactly, so the int and float paths never disagree.
+MAX_EXACT_INT = 2 ** 53
+
+NUMBER_TYPES = (int, float)
+
+
+def is_number(value: t.Any):
+    # bool is a subclass of int, so an isinstance check would accept it
+    return type(value) in NUMBER_TYPES
+
+
+def exact(value: t.Union[int, float]):
+    """Keeps an int result only while a double would have stored it exactly."""
+    if -MAX_EXACT_INT <= value <= MAX_EXACT_INT:
+        return value
+    return float(value)
+
+
+def normalize(value: float):
+    """Turns an integral float into an int when that can't change how Lox sees it."""
+    if not value.is_integer() or not -MAX_EXACT_INT <= value <= MAX_EXACT_INT:
+        return value
+    if value == 0 and math.copysign(1.0, value) < 0:
+        return value  # -0 has no int counterpart
+    return int(value)
+
+
+def format_number(value: t.Union[int, float]):
+    """The digits of a Lox number, without the trimming `print` does."""
+    if type(value) is float:
+        value = normalize(value)
+    if type(value) is int:
+        return str(value)
+    return repr(value)
@@ -64,6 +64,10 @@ class BaseVisitor(ABC):
     def visit_list_get_expr(self, list_get_expr: "List_get_expr"):
         pass
 
+    @abstractmethod
+    def visit_map_expr(self, map_expr: "Map_expr"):
+        pass
+
 
 class Expr(ABC):
    @abstractmethod
@@ -190,3 +194,12 @@ class List_get_expr(Expr):
    def accept(self, visitor: "BaseVisitor"):
        return visitor.visit_list_get_expr(self)
 
+class Map_expr(Expr):
+   def __init__(self, brace: "Token", keys: t.List["Expr"], values: t.List["Expr"]):
+       self.brace = brace
+       self.keys = keys
+       self.values = values
+
+   def accept(self, visitor: "BaseVisitor"):
+       return visitor.visit_map_expr(self)
+
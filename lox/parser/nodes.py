@@ -0,0 +1,41 @@
+import typing as t
+
+from ..lexer.token import Token
+from .expr import Expr
+from .stmt import Stmt
+
+
+def children(node: t.Union[Expr, Stmt]):
+    """The expressions and statements directly inside a node, in source order."""
+    for value in vars(node).values():
+        if isinstance(value, (Expr, Stmt)):
+            yield value
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, (Expr, Stmt)):
+                    yield item
+
+
+def walk(nodes: t.Iterable[t.Union[Expr, Stmt]]):
+    """Every node in the trees rooted at `nodes`, parents before children."""
+    stack = list(reversed(list(nodes)))
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(list(children(node))))
+
+
+def line_of(node: t.Union[Expr, Stmt]):
+    """The line of the first token in a node, or None for a bare literal."""
+    for value in vars(node).values():
+        if isinstance(value, Token):
+            return value.line
+        items = value if isinstance(value, list) else (value,)
+        for item in items:
+            if isinstance(item, Token):
+                return item.line
+            if isinstance(item, (Expr, Stmt)):
+                line = line_of(item)
+                if line is not None:
+                    return line
+    return None
@@ -11,6 +11,7 @@ class Parser:
     def __init__(self, tokens: t.List[Token]):
         self._tokens = tokens
         self._current = 0
+        self._yielded = False # whether the function being parsed contains a yield
     
     def parse(self):
         statements = []
@@ -58,8 +59,12 @@ class Parser:
         self._consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
         self._consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
         # self._block assumes '{' is already consumed
+        enclosing_yielded = self._yielded
+        self._yielded = False
         statements = self._block()
-        return Function_stmt(name, parameters, statements)
+        is_generator = self._yielded
+        self._yielded = enclosing_yielded
+        return Function_stmt(name, parameters, statements, is_generator)
     
     def _var_declaration(self):
         name = self._consume(TokenType.IDENTIFIER, "Expect variable name.")
@@ -99,6 +104,8 @@ class Parser:
             return self._return_statement()
         elif self._match(TokenType.WHILE):
             return self._while_statement()
+        elif self._match(TokenType.YIELD):
+            return self._yield_statement()
         elif self._match(TokenType.LEFT_BRACE):
             return Block_stmt(self._block())
         else:
@@ -107,6 +114,9 @@ class Parser:
     def _for_statement(self):
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'for'.")
 
+        if self._is_foreach():
+            return self._foreach_statement()
+
         initializer = None
         if self._match(TokenType.SEMICOLON):
             pass
@@ -143,6 +153,23 @@ class Parser:
         
         return body
     
+    def _is_foreach(self):
+        # for (x in ...) or for (var x in ...)
+        offset = self._current + (1 if self._check(TokenType.VAR) else 0)
+        return (
+            self._tokens[offset].type == TokenType.IDENTIFIER
+            and self._tokens[offset + 1].type == TokenType.IN
+        )
+
+    def _foreach_statement(self):
+        self._match(TokenType.VAR)
+        name = self._consume(TokenType.IDENTIFIER, "Expect loop variable name.")
+        self._consume(TokenType.IN, "Expect 'in' after loop variable.")
+        iterable = self._expression()
+        self._consume(TokenType.RIGHT_PAREN, "Expect ')' after for clauses.")
+        body = self._statement()
+        return Foreach_stmt(name, iterable, body)
+
     def _if_statement(self):
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'if'.")
         condition = self._expression()
@@ -169,6 +196,15 @@ class Parser:
         self._consume(TokenType.SEMICOLON, "Expect ';' after return value.")
         return Return_stmt(keyword, value)
     
+    def _yield_statement(self):
+        keyword = self._previous()
+        value = None
+        if not self._check(TokenType.SEMICOLON):
+            value = self._expression()
+        self._consume(TokenType.SEMICOLON, "Expect ';' after yield value.")
+        self._yielded = True
+        return Yield_stmt(keyword, value)
+    
     def _while_statement(self):
         self._consume(TokenType.LEFT_PAREN, "Expect '(' after 'while'.")
         condition = self._expression()
@@ -341,9 +377,26 @@ class Parser:
             expr = self._expression()
             self._consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
             return Grouping_expr(expr)
+
+        if self._match(TokenType.LEFT_BRACE):
+            return self._map()
         
         raise self._error(self._peek(), "Expect expression.")
         
+    def _map(self):
+        brace = self._previous()
+        keys = []
+        values = []
+        if not self._check(TokenType.RIGHT_BRACE):
+            while True:
+                keys.append(self._expression())
+                self._consume(TokenType.COLON, "Expect ':' after map key.")
+                values.append(self._expression())
+                if not self._match(TokenType.COMMA):
+                    break
+        self._consume(TokenType.RIGHT_BRACE, "Expect '}' after map entries.")
+        return Map_expr(brace, keys, values)
+
     def _consume(self, token_type: TokenType, message: str):
         if self._check(token_type): return self._advance()
         raise self._error(self._peek(), message)
@@ -394,7 +447,8 @@ class Parser:
                 TokenType.IF,
                 TokenType.WHILE,
                 TokenType.PRINT,
-                TokenType.RETURN
+                TokenType.RETURN,
+                TokenType.YIELD
             ):
                 return
             
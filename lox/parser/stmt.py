@@ -45,6 +45,14 @@ class StmtVisitor(ABC):
     def visit_while_stmt(self, while_stmt: "While_stmt"):
         pass
 
+    @abstractmethod
+    def visit_foreach_stmt(self, foreach_stmt: "Foreach_stmt"):
+        pass
+
+    @abstractmethod
+    def visit_yield_stmt(self, yield_stmt: "Yield_stmt"):
+        pass
+
 
 class Stmt(ABC):
    @abstractmethod
@@ -75,10 +83,11 @@ class Expression_stmt(Stmt):
        return visitor.visit_expression_stmt(self)
 
 class Function_stmt(Stmt):
-   def __init__(self, name: "Token", params: t.List["Token"], body: t.List["Stmt"]):
+   def __init__(self, name: "Token", params: t.List["Token"], body: t.List["Stmt"], is_generator: bool):
        self.name = name
        self.params = params
        self.body = body
+       self.is_generator = is_generator
 
    def accept(self, visitor: "StmtVisitor"):
        return visitor.visit_function_stmt(self)
@@ -131,3 +140,20 @@ class While_stmt(Stmt):
    def accept(self, visitor: "StmtVisitor"):
        return visitor.visit_while_stmt(self)
 
+class Foreach_stmt(Stmt):
+   def __init__(self, name: "Token", iterable: "Expr", body: "Stmt"):
+       self.name = name
+       self.iterable = iterable
+       self.body = body
+
+   def accept(self, visitor: "StmtVisitor"):
+       return visitor.visit_foreach_stmt(self)
+
+class Yield_stmt(Stmt):
+   def __init__(self, keyword: "Token", value: "Expr"):
+       self.keyword = keyword
+       self.value = value
+
+   def accept(self, visitor: "StmtVisitor"):
+       return visitor.visit_yield_stmt(self)
+
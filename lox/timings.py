@@ -0,0 +1,81 @@
+"""Per-phase timing for `pylox --timings`.
+
+Each phase of a run (scan, parse, resolve, interpret) records wall and CPU
+time and what it produced: tokens, syntax tree nodes or resolved local
+variables. It also records the process's peak resident memory as it stood
+when the phase finished. That is a high-water mark for the whole process,
+so it never goes down from one phase to the next; the phase where it jumps
+is the one that needed the memory. Measuring each phase's own peak would
+take tracemalloc, which would slow down the phases being timed.
+"""
+import typing as t
+import json
+import sys
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows, peak memory is left out there
+    resource = None
+
+
+def _peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)
+
+
+class Timings:
+    def __init__(self):
+        # phase name -> {"wall": s, "cpu": s, "process_peak_mb": MB, plus counts}
+        self.phases = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        record = {}
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = time.process_time() - cpu
+            record["process_peak_mb"] = _peak_memory_mb()
+            self.phases[name] = record
+
+    def as_dict(self):
+        phases = {name: dict(record) for name, record in self.phases.items()}
+        for record in phases.values():
+            for count, rate in (("tokens", "tokens_per_s"), ("nodes", "nodes_per_s"), ("records", "records_per_s")):
+                if count in record and record["wall"] > 0:
+                    record[rate] = record[count] / record["wall"]
+        total = {
+            "wall": sum(record["wall"] for record in phases.values()),
+            "cpu": sum(record["cpu"] for record in phases.values()),
+        }
+        return {"phases": phases, "total": total}
+
+    def report(self, stream: t.TextIO = sys.stderr):
+        summary = self.as_dict()
+        stream.write(f"{'phase':<10} {'wall s':>10} {'cpu s':>10} {'proc peak MB':>13}\n")
+        for name, record in summary["phases"].items():
+            peak = record["process_peak_mb"]
+            peak = f"{peak:>13.1f}" if peak is not None else f"{'-':>13}"
+            detail = ""
+            if "tokens_per_s" in record:
+                detail = f"{record['tokens']} tokens, {record['tokens_per_s']:,.0f}/s"
+            elif "nodes_per_s" in record:
+                detail = f"{record['nodes']} nodes, {record['nodes_per_s']:,.0f}/s"
+            elif "records_per_s" in record:
+                detail = f"{record['records']} records, {record['records_per_s']:,.0f}/s"
+            elif "resolved_locals" in record:
+                detail = f"{record['resolved_locals']} locals resolved"
+            stream.write(f"{name:<10} {record['wall']:>10.4f} {record['cpu']:>10.4f} {peak}  {detail}\n")
+        total = summary["total"]
+        stream.write(f"{'total':<10} {total['wall']:>10.4f} {total['cpu']:>10.4f}\n")
+
+    def dump(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.as_dict(), file, indent=2)
@@ -0,0 +1,131 @@
+"""The benchmark runner behind `pylox bench`.
+
+Every benchmark is a Lox script in benchmarks/. Each one runs in a fresh
+interpreter process, first a few times to warm up the OS caches and then
+`--repeat` times for real, and the wall times are summarised as median,
+min, max and median absolute deviation. Results can be saved as JSON and
+compared against an earlier run:
+
+    pylox bench --json base.json
+    pylox bench --baseline base.json      # exits 1 when something got slower
+    pylox bench fib zoo --repeat 10
+"""
+import typing as t
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCHMARK_DIR = Path(__file__).resolve().parents[2] / "benchmarks"
+
+
+def discover(directory: Path, names: t.Sequence[str]):
+    if names:
+        return [directory / f"{name.replace('.lox', '')}.lox" for name in names]
+    return sorted(directory.glob("*.lox"))
+
+
+def run_once(script: Path, workdir: str):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-m", "lox", str(script)],
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        env=_environment(),
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip()
+        raise RuntimeError(f"{script.name} exited with {result.returncode}: {message}")
+    return elapsed
+
+
+def _environment():
+    # run the lox package this file belongs to, not whatever is installed
+    environment = dict(os.environ)
+    root = str(BENCHMARK_DIR.parent)
+    environment["PYTHONPATH"] = os.pathsep.join(filter(None, [root, environment.get("PYTHONPATH")]))
+    return environment
+
+
+def summarise(times: t.List[float]):
+    median = statistics.median(times)
+    return {
+        "runs": times,
+        "median": median,
+        "min": min(times),
+        "max": max(times),
+        "mad": statistics.median(abs(time - median) for time in times),
+    }
+
+
+def compare(results: t.Dict[str, dict], baseline: t.Dict[str, dict], threshold: float):
+    """Adds the median's ratio to the baseline to each result; returns the names that got slower."""
+    regressions = []
+    for name, result in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"]
+        result["baseline_median"] = before["median"]
+        result["ratio"] = ratio
+        # only call it a regression when the change is bigger than the noise
+        noise = (result["mad"] + before.get("mad", 0)) / before["median"]
+        if ratio > 1 + max(threshold, noise):
+            regressions.append(name)
+    return regressions
+
+
+def report(results: t.Dict[str, dict], regressions: t.List[str], stream: t.TextIO = sys.stdout):
+    stream.write(f"{'benchmark':<20} {'median s':>9} {'min s':>9} {'max s':>9} {'mad s':>8} {'vs base':>9}\n")
+    for name, result in results.items():
+        ratio = ""
+        if "ratio" in result:
+            ratio = f"{result['ratio']:.2f}x" + (" !" if name in regressions else "")
+        stream.write(
+            f"{name:<20} {result['median']:>9.3f} {result['min']:>9.3f} "
+            f"{result['max']:>9.3f} {result['mad']:>8.3f} {ratio:>9}\n"
+        )
+
+
+def main(args: t.Optional[t.List[str]] = None):
+    parser = argparse.ArgumentParser(prog="pylox bench", description="Run the Lox benchmark suite.")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all)")
+    parser.add_argument("--dir", type=Path, default=BENCHMARK_DIR, help="directory of .lox benchmarks")
+    parser.add_argument("--warmup", type=int, default=1, help="untimed runs per benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument("--json", metavar="FILE", help="save the results as JSON")
+    parser.add_argument("--baseline", metavar="FILE", help="compare against results saved with --json")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="slowdown that counts as a regression (default: 0.05 = 5%%)")
+    options = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for script in discover(options.dir, options.names):
+            if not script.exists():
+                parser.error(f"no benchmark '{script.stem}' in {options.dir}")
+            for _ in range(options.warmup):
+                run_once(script, workdir)
+            times = [run_once(script, workdir) for _ in range(options.repeat)]
+            results[script.stem] = summarise(times)
+            sys.stderr.write(f"{script.stem}: {results[script.stem]['median']:.3f}s\n")
+
+    regressions = []
+    if options.baseline:
+        with open(options.baseline) as file:
+            regressions = compare(results, json.load(file)["benchmarks"], options.threshold)
+    report(results, regressions)
+
+    if options.json:
+        with open(options.json, "w") as file:
+            json.dump({"python": sys.version.split()[0], "benchmarks": results}, file, indent=2)
+    if regressions:
+        sys.stderr.write(f"slower than baseline: {', '.join(regressions)}\n")
+        exit(1)
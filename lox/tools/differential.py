@@ -0,0 +1,285 @@
+"""The differential test runner behind `pylox difftest`.
+
+Every program in corpus/ is run under each interpreter configuration: the
+plain interpreter, with the inline shape caches switched off, with hooks,
+profiling, counters, memory tracking or sampling switched on, and guided
+by a profile recorded from a first run. Each run is checked against the
+expectations written in the program itself,
+
+    print 7 / 2; // expect: 3.5
+    // expect runtime error: Operands must be numbers.
+    // expect error: Can't return from top-level code.
+
+and the results are printed as one table with the time of each
+configuration relative to the plain interpreter. A program without any
+expectations is checked against what the plain interpreter printed.
+
+    pylox difftest
+    pylox difftest closures classes --config default --config no-cache
+"""
+import typing as t
+import argparse
+import io
+import re
+import sys
+import time
+import traceback
+from contextlib import contextmanager, redirect_stderr
+from pathlib import Path
+
+from ..lexer.scanner import Scanner
+from ..parser.parser import Parser
+from ..interpreter.interpreter import Interpreter
+from ..interpreter.resolver import Resolver
+from ..interpreter.output import Output
+from ..interpreter.hooks import EVENTS
+from ..interpreter.profiler import ProfilingInterpreter
+from ..interpreter.stats import RuntimeStats
+from ..interpreter.heap import MemoryTracker
+from ..interpreter.sampler import Sampler
+from ..interpreter.pgo import RecordingInterpreter, GuidedInterpreter
+from ..handle_errors import update_error, has_error, has_runtime_error
+from .bench import discover
+
+CORPUS_DIR = Path(__file__).resolve().parents[2] / "corpus"
+
+_EXPECT = re.compile(r"// expect: ?(.*)")
+_EXPECT_RUNTIME_ERROR = re.compile(r"// expect runtime error: (.+)")
+_EXPECT_ERROR = re.compile(r"// expect error: (.+)")
+
+
+class _NoCache(dict):
+    """A shape cache that never remembers anything, so every lookup takes the slow path."""
+    def __setitem__(self, key, value):
+        pass
+
+
+def _ignore(*args):
+    pass
+
+
+@contextmanager
+def _default(output: Output, source: str):
+    yield Interpreter(output)
+
+@contextmanager
+def _no_cache(output: Output, source: str):
+    interpreter = Interpreter(output)
+    interpreter._shape_caches = _NoCache()
+    yield interpreter
+
+@contextmanager
+def _hooks(output: Output, source: str):
+    interpreter = Interpreter(output)
+    for event in EVENTS:
+        interpreter.hooks.add(event, _ignore)
+    yield interpreter
+
+@contextmanager
+def _profile(output: Output, source: str):
+    yield ProfilingInterpreter(lines=True, output=output)
+
+@contextmanager
+def _stats(output: Output, source: str):
+    stats = RuntimeStats()
+    stats.enable()
+    try:
+        yield Interpreter(output)
+    finally:
+        stats.disable()
+
+@contextmanager
+def _memory(output: Output, source: str):
+    interpreter = Interpreter(output)
+    tracker = MemoryTracker(interpreter)
+    tracker.attach()
+    try:
+        yield interpreter
+    finally:
+        tracker.detach()
+
+@contextmanager
+def _sample(output: Output, source: str):
+    sampler = Sampler()
+    sampler.start()
+    try:
+        yield Interpreter(output)
+    finally:
+        sampler.stop()
+
+@contextmanager
+def _pgo(output: Output, source: str):
+    # record a profile on a throwaway run first, then run again with it
+    recorder = RecordingInterpreter(Output(io.StringIO()))
+    with redirect_stderr(io.StringIO()):
+        _interpret(source, recorder)
+    update_error(False, False)
+    yield GuidedInterpreter(recorder.as_dict(), output)
+
+# name -> context manager that sets up an interpreter for a program, writing to
+# the given Output; the first one is the reference the others are timed against
+CONFIGURATIONS = {
+    "default": _default,
+    "no-cache": _no_cache,
+    "hooks": _hooks,
+    "profile": _profile,
+    "stats": _stats,
+    "memory": _memory,
+    "sample": _sample,
+    "pgo": _pgo,
+}
+
+
+def expectations(source: str):
+    """Reads the expected stdout, errors and exit code out of a program's comments."""
+    stdout = []
+    errors = []
+    runtime_error = None
+    for line in source.splitlines():
+        match = _EXPECT.search(line)
+        if match:
+            stdout.append(match.group(1))
+            continue
+        match = _EXPECT_RUNTIME_ERROR.search(line)
+        if match:
+            runtime_error = match.group(1)
+            continue
+        match = _EXPECT_ERROR.search(line)
+        if match:
+            errors.append(match.group(1))
+    if not (stdout or errors or runtime_error):
+        return None
+    exit_code = 65 if errors else 70 if runtime_error else 0
+    return {"stdout": stdout, "errors": errors, "runtime_error": runtime_error, "exit_code": exit_code}
+
+
+def _interpret(source: str, interpreter: Interpreter):
+    # the same phases as lox.__main__.run, returning the exit code instead of exiting
+    tokens = Scanner(source).scan_tokens()
+    if has_error(): return 65
+    statements = Parser(tokens).parse()
+    if has_error(): return 65
+    Resolver(interpreter).resolve(statements)
+    if has_error(): return 65
+    interpreter.interpret(statements)
+    interpreter.output.flush()
+    return 70 if has_runtime_error() else 0
+
+
+def run_program(source: str, configuration: str):
+    """Runs a program in a fresh interpreter; returns its stdout, stderr, exit code and time."""
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    output = Output(stdout, flush_policy="full")
+    update_error(False, False)
+    elapsed = 0.0
+    with redirect_stderr(stderr):
+        try:
+            with CONFIGURATIONS[configuration](output, source) as interpreter:
+                start = time.perf_counter()
+                exit_code = _interpret(source, interpreter)
+                elapsed = time.perf_counter() - start
+        except Exception:
+            # a Python exception is a bug in the interpreter; report it like any other mismatch
+            output.flush()
+            traceback.print_exc(file=stderr)
+            exit_code = "crash"
+    update_error(False, False)
+    return {
+        "stdout": stdout.getvalue().splitlines(),
+        "stderr": stderr.getvalue().splitlines(),
+        "exit_code": exit_code,
+        "seconds": elapsed,
+    }
+
+
+def check(result: dict, expected: dict):
+    """Returns how a run differs from what was expected, as a list of messages."""
+    problems = []
+    if result["exit_code"] != expected["exit_code"]:
+        problems.append(f"exit code {result['exit_code']}, expected {expected['exit_code']}")
+    if result["exit_code"] == "crash":
+        problems.append(result["stderr"][-1])
+    for number, (line, want) in enumerate(zip(result["stdout"], expected["stdout"]), 1):
+        if line != want:
+            problems.append(f"stdout line {number} is '{line}', expected '{want}'")
+            break
+    if len(result["stdout"]) != len(expected["stdout"]):
+        problems.append(f"{len(result['stdout'])} lines of stdout, expected {len(expected['stdout'])}")
+    if expected["runtime_error"] is not None and result["stderr"][:1] != [expected["runtime_error"]]:
+        problems.append(f"expected runtime error '{expected['runtime_error']}'")
+    reported = [line.split(": ", 1)[-1] for line in result["stderr"]]
+    for message in expected["errors"]:
+        if message not in reported:
+            problems.append(f"expected error '{message}'")
+    if "stderr" in expected and result["stderr"] != expected["stderr"]:
+        problems.append("stderr differs")
+    return problems
+
+
+def _observed(result: dict):
+    # what the reference configuration did, for programs that state no expectations
+    return {
+        "stdout": result["stdout"],
+        "stderr": result["stderr"],
+        "errors": [],
+        "runtime_error": None,
+        "exit_code": result["exit_code"],
+    }
+
+
+def run_corpus(programs: t.Sequence[Path], configurations: t.Sequence[str], repeat: int = 1):
+    """Returns {program: {configuration: result}}; each result also has its `problems`."""
+    results = {}
+    for program in programs:
+        source = program.read_text()
+        expected = expectations(source)
+        results[program.stem] = row = {}
+        for configuration in configurations:
+            runs = [run_program(source, configuration) for _ in range(repeat)]
+            result = min(runs, key=lambda run: run["seconds"])
+            if expected is None:
+                expected = _observed(result)
+            result["problems"] = check(result, expected)
+            row[configuration] = result
+    return results
+
+
+def report(results: t.Dict[str, dict], configurations: t.Sequence[str], stream: t.TextIO = sys.stdout):
+    reference = configurations[0]
+    stream.write(f"{'program':<20} {reference + ' ms':>12}" + "".join(f" {name:>10}" for name in configurations[1:]) + "\n")
+    for program, row in results.items():
+        base = row[reference]
+        cells = [f"{'FAIL' if base['problems'] else ''} {base['seconds'] * 1000:.1f}".strip()]
+        for name in configurations[1:]:
+            result = row[name]
+            ratio = result["seconds"] / base["seconds"] if base["seconds"] else 0
+            cells.append("FAIL" if result["problems"] else f"{ratio:.2f}x")
+        stream.write(f"{program:<20} {cells[0]:>12}" + "".join(f" {cell:>10}" for cell in cells[1:]) + "\n")
+
+    for program, row in results.items():
+        for name, result in row.items():
+            for problem in result["problems"]:
+                stream.write(f"{program} [{name}]: {problem}\n")
+
+
+def main(args: t.Optional[t.List[str]] = None):
+    parser = argparse.ArgumentParser(prog="pylox difftest",
+                                     description="Run the Lox corpus under every interpreter configuration.")
+    parser.add_argument("names", nargs="*", help="programs to run (default: all)")
+    parser.add_argument("--dir", type=Path, default=CORPUS_DIR, help="directory of .lox programs")
+    parser.add_argument("--config", dest="configurations", action="append", choices=list(CONFIGURATIONS),
+                        help="configuration to run, may be repeated (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per program and configuration; the fastest is reported")
+    options = parser.parse_args(sys.argv[1:] if args is None else args)
+
+    configurations = options.configurations or list(CONFIGURATIONS)
+    programs = discover(options.dir, options.names)
+    for program in programs:
+        if not program.exists():
+            parser.error(f"no program '{program.stem}' in {options.dir}")
+
+    results = run_corpus(programs, configurations, options.repeat)
+    report(results, configurations)
+    if any(result["problems"] for row in results.values() for result in row.values()):
+        exit(1)
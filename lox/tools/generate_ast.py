@@ -71,16 +71,19 @@ define_ast(output_dir, "BaseVisitor", "Expr",
     "Unary_expr | operator: \"Token\", right: \"Expr\"",
     "Variable_expr | name: \"Token\"",
     "List_expr | name: \"Token\"",
-    "List_get_expr | name: \"Expr\", paren: \"Token\", index: \"Expr\""])
+    "List_get_expr | name: \"Expr\", paren: \"Token\", index: \"Expr\"",
+    "Map_expr | brace: \"Token\", keys: t.List[\"Expr\"], values: t.List[\"Expr\"]"])
 
 define_ast(output_dir, "StmtVisitor", "Stmt",
     ["Block_stmt | statements: t.List[\"Stmt\"]",
     "Class_stmt | name: \"Token\", superclass: \"Variable_expr\", methods: t.List[\"Function_stmt\"]",
     "Expression_stmt | expression: \"Expr\"",
-    "Function_stmt | name: \"Token\", params: t.List[\"Token\"], body: t.List[\"Stmt\"]",
+    "Function_stmt | name: \"Token\", params: t.List[\"Token\"], body: t.List[\"Stmt\"], is_generator: bool",
     "If_stmt | condition: \"Expr\", then_branch: \"Stmt\", else_branch: \"Stmt\"",
     "Print_stmt | expression: \"Expr\"",
     "Return_stmt | keyword: \"Token\", value: \"Expr\"",
     "Var_stmt | name: \"Token\", initializer: \"Expr\"",
     "List_stmt | name: \"Token\", values: t.List[\"Expr\"]",
-    "While_stmt | condition: \"Expr\", body: \"Stmt\""])
\ No newline at end of file
+    "While_stmt | condition: \"Expr\", body: \"Stmt\"",
+    "Foreach_stmt | name: \"Token\", iterable: \"Expr\", body: \"Stmt\"",
+    "Yield_stmt | keyword: \"Token\", value: \"Expr\""])
\ No newline at end of file